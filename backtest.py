@@ -5,7 +5,71 @@ import numpy as np
 from config import TRADING_FEE_PCT
 import numba
 
-@numba.jit(nopython=True)
+# Passed into the JIT kernels as an argument rather than read as a module
+# global: Numba's on-disk cache (cache=True) does not key on global values,
+# so a baked-in constant would survive a config fee change via the shared
+# cache dir and silently skew every backtest. A float64 argument only
+# specializes on dtype, so there is no extra compile cost.
+FEE_FACTOR = 1.0 - TRADING_FEE_PCT
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _forward_fill_positions(raw_signal):
+    """
+    Forward-fill the raw signal into a position array. Used on the
+    min_holding_period == 0 path, where no separate change array is needed
+    because the performance kernel detects position changes inline.
+    """
+    n = raw_signal.shape[0]
+    position = np.empty(n, dtype=raw_signal.dtype)
+    if n == 0:
+        return position
+    position[0] = raw_signal[0]
+    for i in range(1, n):
+        position[i] = raw_signal[i] if raw_signal[i] != 0 else position[i-1]
+    return position
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _calculate_performance_from_positions(prices, positions, initial_capital,
+                                          fee_factor):
+    """
+    Same streaming performance loop as _calculate_performance, but with the
+    position-change test done inline so callers that don't enforce a minimum
+    holding period never have to materialize a change array.
+    """
+    n = len(prices)
+    portfolio_value = initial_capital
+    num_trades = 0
+    for i in range(1, n):
+        r = prices[i] / prices[i-1] - 1.0
+        portfolio_value *= 1.0 + positions[i-1] * r
+        if positions[i] != positions[i-1]:
+            portfolio_value *= fee_factor
+            num_trades += 1
+
+    total_return = (portfolio_value / initial_capital) - 1.0
+
+    return total_return, portfolio_value, num_trades
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _prepare_positions(raw_signal):
+    """
+    Numba-optimized function that forward-fills the raw signal into a
+    position array and computes position changes in a single pass,
+    replacing the two Python-level loops that used to run per backtest.
+    """
+    n = raw_signal.shape[0]
+    position = np.empty(n, dtype=raw_signal.dtype)
+    pos_change = np.empty(n, dtype=raw_signal.dtype)
+    if n == 0:
+        return position, pos_change
+    position[0] = raw_signal[0]
+    pos_change[0] = 0
+    for i in range(1, n):
+        position[i] = raw_signal[i] if raw_signal[i] != 0 else position[i-1]
+        pos_change[i] = position[i] - position[i-1]
+    return position, pos_change
+
+@numba.jit(nopython=True, nogil=True, cache=True)
 def _apply_min_holding_period(position_array, change_array, min_holding_period):
     """
     Numba-optimized function to apply minimum holding period.
@@ -26,108 +90,260 @@ def _apply_min_holding_period(position_array, change_array, min_holding_period):
                 last_trade_i = i
     return position_array, change_array
 
-@numba.jit(nopython=True)
-def _calculate_performance(prices, positions, position_changes, trading_fee_pct, initial_capital):
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _calculate_performance(prices, positions, position_changes, initial_capital,
+                           fee_factor):
     """
     Numba-optimized function to calculate cumulative performance.
-    
+
+    A single streaming loop over the input arrays: no intermediate
+    returns/growth/fee arrays are allocated, the portfolio value is
+    carried as a scalar.
+
     Parameters:
     - prices: array of price values
     - positions: array of positions (-1, 0, 1)
     - position_changes: array indicating position changes (non-zero when position changes)
-    - trading_fee_pct: fee percentage for each trade
     - initial_capital: starting capital
-    
+
     Returns:
     - total_return: final return percentage
     - final_portfolio_value: final portfolio value
     - num_trades: number of trades executed
     """
-    # Calculate returns from prices
-    returns = np.zeros(len(prices))
-    for i in range(1, len(prices)):
-        returns[i] = prices[i] / prices[i-1] - 1.0
-    
-    # Shift positions by 1 for strategy returns
-    shifted_positions = np.zeros(len(positions))
-    for i in range(1, len(positions)):
-        shifted_positions[i] = positions[i-1]
-    
-    # Calculate strategy returns
-    strategy_returns = shifted_positions * returns
-    
-    # Apply trading fees
-    growth_factors = 1.0 + strategy_returns
-    fee_factors = np.ones(len(position_changes))
-    for i in range(len(position_changes)):
-        if position_changes[i] != 0:
-            fee_factors[i] = 1.0 - trading_fee_pct
-    
-    # Calculate cumulative performance
+    n = len(prices)
     portfolio_value = initial_capital
-    for i in range(len(growth_factors)):
-        portfolio_value *= growth_factors[i] * fee_factors[i]
-    
-    # Calculate number of trades
     num_trades = 0
-    for change in position_changes:
-        if change != 0:
+    if n > 0 and position_changes[0] != 0:
+        portfolio_value *= fee_factor
+        num_trades += 1
+    for i in range(1, n):
+        r = prices[i] / prices[i-1] - 1.0
+        portfolio_value *= 1.0 + positions[i-1] * r
+        if position_changes[i] != 0:
+            portfolio_value *= fee_factor
             num_trades += 1
-    
+
     total_return = (portfolio_value / initial_capital) - 1.0
-    
+
     return total_return, portfolio_value, num_trades
 
-def backtest_strategy_optimized(
-    df: pd.DataFrame,
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _calculate_performance_batch(prices, positions_2d, pos_change_2d,
+                                 initial_capital, fee_factor,
+                                 min_holding_period):
+    """
+    Numba-parallel batch kernel: backtests every column of a (N, K)
+    position matrix in one call, with numba.prange distributing the K
+    parameter variants across cores.
+
+    Returns three length-K arrays: (total_returns, portfolio_values, num_trades).
+    """
+    n, k = positions_2d.shape
+    total_returns = np.empty(k, dtype=np.float64)
+    portfolio_values = np.empty(k, dtype=np.float64)
+    num_trades = np.empty(k, dtype=np.int64)
+    for j in numba.prange(k):
+        if min_holding_period > 0:
+            position = positions_2d[:, j].copy()
+            pos_change = pos_change_2d[:, j].copy()
+            _apply_min_holding_period(position, pos_change, min_holding_period)
+        else:
+            position = positions_2d[:, j]
+            pos_change = pos_change_2d[:, j]
+        tr, pv, nt = _calculate_performance(
+            prices, position, pos_change, initial_capital, fee_factor
+        )
+        total_returns[j] = tr
+        portfolio_values[j] = pv
+        num_trades[j] = nt
+    return total_returns, portfolio_values, num_trades
+
+@numba.jit(nopython=True, parallel=True, cache=True)
+def _calculate_performance_batch_pruned(prices, positions_2d, pos_change_2d,
+                                        initial_capital, fee_factor,
+                                        min_holding_period,
+                                        suffix_growth, perf_floors):
+    """
+    Branch-and-bound variant of _calculate_performance_batch. suffix_growth
+    holds, per bar, the growth of a portfolio perfectly positioned (and
+    unfeed) over every remaining bar - an upper bound on what any signal can
+    still earn. Every 1024 bars each column checks whether even that bound
+    leaves its total return below perf_floors[j]; if so the column can no
+    longer win and is abandoned with a -inf return sentinel.
+
+    Floors must be derived so that a column below its floor cannot beat the
+    incumbent best score; callers disable pruning by passing -inf floors.
+    """
+    n, k = positions_2d.shape
+    total_returns = np.empty(k, dtype=np.float64)
+    portfolio_values = np.empty(k, dtype=np.float64)
+    num_trades = np.empty(k, dtype=np.int64)
+    for j in numba.prange(k):
+        if min_holding_period > 0:
+            position = positions_2d[:, j].copy()
+            pos_change = pos_change_2d[:, j].copy()
+            _apply_min_holding_period(position, pos_change, min_holding_period)
+        else:
+            position = positions_2d[:, j]
+            pos_change = pos_change_2d[:, j]
+
+        portfolio_value = initial_capital
+        trades = 0
+        pruned = False
+        if n > 0 and pos_change[0] != 0:
+            portfolio_value *= fee_factor
+            trades += 1
+        for i in range(1, n):
+            r = prices[i] / prices[i-1] - 1.0
+            portfolio_value *= 1.0 + position[i-1] * r
+            if pos_change[i] != 0:
+                portfolio_value *= fee_factor
+                trades += 1
+            if (i & 1023) == 0:
+                bound = portfolio_value * suffix_growth[i+1] / initial_capital - 1.0
+                if bound < perf_floors[j]:
+                    pruned = True
+                    break
+
+        if pruned:
+            total_returns[j] = -np.inf
+            portfolio_values[j] = 0.0
+            num_trades[j] = 0
+        else:
+            total_returns[j] = (portfolio_value / initial_capital) - 1.0
+            portfolio_values[j] = portfolio_value
+            num_trades[j] = trades
+    return total_returns, portfolio_values, num_trades
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _combine_and_backtest(prices, signals_2d, buy_is_and, sell_is_and,
+                          min_holding_period, initial_capital, fee_factor):
+    """
+    Fused combine + backtest: one walk over the time axis evaluates the
+    buy/sell operator across the strategy columns, carries the
+    forward-fill state, enforces the minimum holding period, and steps
+    the portfolio - no combined-signal or position array is ever
+    materialized between the stages.
+
+    Semantics match the staged pipeline exactly: sell wins when both
+    operators fire (combine_signals); a cancelled trade holds the prior
+    position for that bar only, after which the position reverts to the
+    raw forward-filled signal without a fee (_apply_min_holding_period
+    overwrites just the cancelled bar and tests the pre-cancellation
+    change array); and bar 0 never pays a fee (_prepare_positions
+    defines pos_change[0] = 0).
+    """
+    n, n_strats = signals_2d.shape
+    portfolio_value = initial_capital
+    num_trades = 0
+    ffill_prev = np.int8(0)  # combined signal, forward-filled
+    pos_prev = np.int8(0)    # held position after min-hold cancellations
+    last_trade_i = -1
+    for i in range(n):
+        n_buy = 0
+        n_sell = 0
+        for j in range(n_strats):
+            s = signals_2d[i, j]
+            if s == 1:
+                n_buy += 1
+            elif s == -1:
+                n_sell += 1
+        if buy_is_and:
+            buy = n_buy == n_strats
+        else:
+            buy = n_buy > 0
+        if sell_is_and:
+            sell = n_sell == n_strats
+        else:
+            sell = n_sell > 0
+
+        ffill = ffill_prev
+        if sell:
+            ffill = np.int8(-1)
+        elif buy:
+            ffill = np.int8(1)
+
+        if i == 0:
+            ffill_prev = ffill
+            pos_prev = ffill
+            continue
+
+        # Growth over (i-1, i] at the position held coming into bar i
+        r = prices[i] / prices[i-1] - 1.0
+        portfolio_value *= 1.0 + pos_prev * r
+
+        if ffill != ffill_prev:
+            if (min_holding_period > 0 and last_trade_i >= 0
+                    and (i - last_trade_i) < min_holding_period):
+                # Trade cancelled: this bar holds the prior position
+                pos = pos_prev
+            else:
+                pos = ffill
+                portfolio_value *= fee_factor
+                num_trades += 1
+                last_trade_i = i
+        else:
+            # No raw change: the position tracks the raw signal again,
+            # even right after a cancellation
+            pos = ffill
+        pos_prev = pos
+        ffill_prev = ffill
+
+    total_return = (portfolio_value / initial_capital) - 1.0
+    return total_return, portfolio_value, num_trades
+
+def backtest_combined_signals(prices, signals_2d, buy_operator="AND",
+                              sell_operator="AND", initial_capital=10000,
+                              min_holding_period=0):
+    """
+    Backtest a stack of per-strategy signals (one int8 column each) in a
+    single fused kernel pass. Equivalent to combine_signals followed by
+    backtest_strategy_arr, without the intermediate arrays.
+    """
+    prices = np.ascontiguousarray(np.asarray(prices, dtype=np.float64))
+    signals_2d = np.ascontiguousarray(np.asarray(signals_2d, dtype=np.int8))
+    return _combine_and_backtest(
+        prices, signals_2d, buy_operator == "AND", sell_operator == "AND",
+        min_holding_period, initial_capital, FEE_FACTOR
+    )
+
+def backtest_strategy_arr(
+    prices: np.ndarray,
+    raw_signal: np.ndarray,
     initial_capital: float = 10000,
-    min_holding_period: int = 0,
-    precomputed_returns: pd.Series = None
+    min_holding_period: int = 0
 ):
     """
-    Optimized vectorized backtest that uses Numba JIT compilation
-    for the performance-critical parts.
-    """
-    if "signal" not in df.columns:
-        raise ValueError("DataFrame must have a 'signal' column (+1, -1, or 0).")
+    Array-only backtest entrypoint: takes a float64 price array and an
+    int8 signal array and dispatches straight to the JIT kernels.
 
-    # Extract arrays from DataFrame for Numba compatibility
-    if precomputed_returns is not None:
-        returns = precomputed_returns.values
-    else:
-        returns = df["close_price"].pct_change().fillna(0).values
-    
-    # Convert to native NumPy arrays for Numba
-    prices = df["close_price"].values.astype(np.float64)
-    raw_signal = df["signal"].values.astype(np.float64)
-    
-    # Forward-fill to ensure we hold +1 or -1
-    position = np.zeros_like(raw_signal)
-    position[0] = raw_signal[0]
-    for i in range(1, len(position)):
-        position[i] = raw_signal[i] if raw_signal[i] != 0 else position[i-1]
-    
-    # Detect position changes
-    pos_change = np.zeros_like(position)
-    for i in range(1, len(position)):
-        pos_change[i] = position[i] - position[i-1]
-    
-    # Enforce min holding period
+    Optimizer inner loops call this instead of backtest_strategy so no
+    per-iteration pd.DataFrame (index, BlockManager, dtype checks) is
+    ever built just to be unpacked again.
+    """
     if min_holding_period > 0:
+        # Forward-fill and detect position changes in one JIT-compiled pass;
+        # the change array is needed to enforce the holding period
+        position, pos_change = _prepare_positions(raw_signal)
         position, pos_change = _apply_min_holding_period(position, pos_change, min_holding_period)
-    
-    # Calculate performance using Numba-optimized function
-    total_return, final_portfolio_value, num_trades = _calculate_performance(
-        prices, position, pos_change, TRADING_FEE_PCT, initial_capital
+        return _calculate_performance(
+            prices, position, pos_change, initial_capital, FEE_FACTOR
+        )
+
+    # Common case: no holding period to enforce, so skip the change array
+    # entirely - the kernel spots position flips inline
+    position = _forward_fill_positions(raw_signal)
+    return _calculate_performance_from_positions(
+        prices, position, initial_capital, FEE_FACTOR
     )
-    
-    return total_return, final_portfolio_value, num_trades
 
 def backtest_strategy(
     df: pd.DataFrame,
     initial_capital: float = 10000,
     min_holding_period: int = 0,
-    precomputed_returns: pd.Series = None
+    precomputed_returns: pd.Series = None,
+    signal=None
 ):
     """
     Vectorized backtest that:
@@ -135,15 +351,60 @@ def backtest_strategy(
       - Computes total_return, final_portfolio_val, num_trades
       - Deducts TRADING_FEE_PCT each time there's a position change
         (based on the current portfolio value).
-      - Accepts optional 'precomputed_returns' so we don't repeatedly do pct_change.
-    """
-    # Use the optimized version if Numba is available
-    try:
-        return backtest_strategy_optimized(df, initial_capital, min_holding_period, precomputed_returns)
-    except Exception as e:
-        # Fall back to the original implementation if there's an error with Numba
-        print(f"Warning: Falling back to standard backtest due to: {e}")
-    
+    Thin DataFrame shim over backtest_strategy_arr, kept for external
+    callers; the performance-critical parts run through Numba
+    JIT-compiled kernels and Numba is a hard dependency of this module.
+
+    The signal can be passed directly as an array/Series via 'signal',
+    letting callers skip the df["signal"] column insert (a BlockManager
+    copy) that the column-based path implies.
+    """
+    if signal is None:
+        if "signal" not in df.columns:
+            raise ValueError("DataFrame must have a 'signal' column (+1, -1, or 0).")
+        signal = df["signal"]
+
+    # Note: the performance kernel derives returns from prices directly,
+    # so no pct_change is computed here; 'precomputed_returns' is accepted
+    # for API compatibility with callers that share a returns series.
+
+    # Convert to native NumPy arrays for Numba; signals only take values
+    # in {-1, 0, +1} (changes in {-2..2}) so int8 suffices and cuts the
+    # memory footprint of the signal-side arrays 8x vs float64
+    prices = df["close_price"].values.astype(np.float64)
+    raw_signal = np.asarray(signal, dtype=np.int8)
+
+    return backtest_strategy_arr(
+        prices, raw_signal, initial_capital, min_holding_period
+    )
+
+def pct_change_arr(prices):
+    """
+    Bar-to-bar returns of a price array: pct_change with a zero head, in
+    one pass over a preallocated buffer. pct_change().fillna(0) scans
+    the column three times (shift, divide, fillna) through pandas
+    dispatch and allocates two intermediate Series for the same result.
+    """
+    prices = np.asarray(prices)
+    if prices.dtype != np.float32:
+        prices = prices.astype(np.float64, copy=False)
+    returns = np.empty_like(prices)
+    if returns.shape[0]:
+        returns[0] = 0.0
+        np.divide(prices[1:], prices[:-1], out=returns[1:])
+        returns[1:] -= 1.0
+    return returns
+
+def backtest_strategy_pandas(
+    df: pd.DataFrame,
+    initial_capital: float = 10000,
+    min_holding_period: int = 0,
+    precomputed_returns: pd.Series = None
+):
+    """
+    Legacy pandas/NumPy implementation of backtest_strategy, kept off the
+    hot path as a reference for debugging the JIT kernels.
+    """
     if "signal" not in df.columns:
         raise ValueError("DataFrame must have a 'signal' column (+1, -1, or 0).")
 
@@ -151,52 +412,61 @@ def backtest_strategy(
     if precomputed_returns is not None:
         returns = precomputed_returns
     else:
-        returns = df["close_price"].pct_change().fillna(0)
+        returns = pct_change_arr(df["close_price"].to_numpy())
 
     # 2) Position from signal
-    # forward-fill to ensure we hold +1 or -1
-    raw_signal = df["signal"]
-    position = raw_signal.ffill().fillna(0)
+    # Forward-fill to ensure we hold +1 or -1: carry the index of the last
+    # non-zero signal forward with np.maximum.accumulate instead of the
+    # pandas ffill/fillna chain (one pass, no intermediate Series)
+    sig = df["signal"].to_numpy(dtype=np.float64)
+    nonzero = sig != 0
+    last_idx = np.where(nonzero, np.arange(len(sig)), 0)
+    np.maximum.accumulate(last_idx, out=last_idx)
+    pos_arr = sig[last_idx]
+    pos_arr[~np.cumsum(nonzero).astype(bool)] = 0  # flat before first signal
 
-    # 3) Detect position changes
-    pos_change = position.diff().fillna(0)
+    # 3) Detect position changes (prepend the first value so index 0 is 0)
+    pos_change = (
+        np.diff(pos_arr, prepend=pos_arr[0])
+        if pos_arr.size else np.zeros(0, dtype=np.float64)
+    )
 
-    # 4) Enforce min holding period
+    # 4) Enforce min holding period (arrays are local, mutate in place)
     if min_holding_period > 0:
-        pos_array = position.values.copy()
-        change_array = pos_change.values.copy()
         last_trade_i = None
-        for i in range(len(pos_array)):
-            if change_array[i] != 0:
+        for i in range(len(pos_arr)):
+            if pos_change[i] != 0:
                 if last_trade_i is not None:
                     # Bars since last trade
                     if (i - last_trade_i) < min_holding_period:
                         # Cancel this trade
-                        change_array[i] = 0
-                        pos_array[i] = pos_array[i-1]
+                        pos_change[i] = 0
+                        pos_arr[i] = pos_arr[i-1]
                     else:
                         last_trade_i = i
                 else:
                     last_trade_i = i
-        position = pd.Series(pos_array, index=position.index)
-        pos_change = pd.Series(change_array, index=pos_change.index)
 
     # 5) Number of trades
-    num_trades = int((pos_change != 0).sum())
+    num_trades = int(np.count_nonzero(pos_change))
 
-    # 6) Strategy returns (shift position by 1)
-    shifted_pos = position.shift(1, fill_value=0)
-    strategy_returns = shifted_pos * returns
+    # 6) Strategy returns (shift position by 1), fully in NumPy
+    returns_arr = np.asarray(returns, dtype=np.float64)
+    shifted_pos = np.empty_like(pos_arr)
+    if len(shifted_pos) > 0:
+        shifted_pos[0] = 0.0
+        shifted_pos[1:] = pos_arr[:-1]
+    strategy_returns = shifted_pos * returns_arr
 
-    # 7) Apply fee whenever position changes
-    growth_factor = 1.0 + strategy_returns
-    fee_factor = np.where(pos_change != 0, 1.0 - TRADING_FEE_PCT, 1.0)
-    combined_factor = growth_factor * fee_factor
+    # 7) Apply fee whenever position changes, in place on the growth factors
+    # (no separate length-N fee array)
+    combined_factor = 1.0 + strategy_returns
+    combined_factor[pos_change != 0] *= 1.0 - TRADING_FEE_PCT
 
     # 8) Cumulative performance
-    cumulative_factor = pd.Series(combined_factor).cumprod()
+    cumulative_factor = np.cumprod(combined_factor)
     final_portfolio_value = (
-        initial_capital * cumulative_factor.iloc[-1]
+        initial_capital * cumulative_factor[-1]
         if len(cumulative_factor) > 0
         else initial_capital
     )
@@ -204,14 +474,18 @@ def backtest_strategy(
 
     return total_return, final_portfolio_value, num_trades
 
-def buy_and_hold(df: pd.DataFrame, initial_capital: float = 10000):
-    """Simple buy-and-hold for comparison."""
-    if len(df) == 0:
+def buy_and_hold(close_prices: np.ndarray, initial_capital: float = 10000):
+    """Simple buy-and-hold for comparison.
+
+    Takes the close-price array directly (a zero-copy view via
+    df["close_price"].to_numpy()) so callers never have to copy a frame
+    just to hand over first/last close.
+    """
+    prices = np.asarray(close_prices)
+    if prices.size == 0:
         return 0.0, initial_capital
 
-    buy_price = df["close_price"].iloc[0]
-    sell_price = df["close_price"].iloc[-1]
-    total_return = (sell_price / buy_price) - 1.0
-    final_portfolio_value = initial_capital * (1 + total_return)
+    total_return = (prices[-1] / prices[0]) - 1.0
+    final_portfolio_value = initial_capital * (1.0 + total_return)
 
     return total_return, final_portfolio_value
\ No newline at end of file
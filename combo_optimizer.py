@@ -1,9 +1,13 @@
 # combo_optimizer.py - Fix for default parameters
 
 import itertools
+import os
+import concurrent.futures
 import pandas as pd
 import numpy as np
 import gc
+import xxhash
+from joblib import Parallel, delayed
 from typing import List, Dict
 
 from config import (
@@ -12,93 +16,415 @@ from config import (
     SHARPE_RATIO_WEIGHT_GRID,
     STRATEGY_PARAM_GRID  # Import default parameters grid
 )
-from backtest import backtest_strategy
-from combo_signals import combine_signals
+from backtest import (
+    FEE_FACTOR,
+    backtest_strategy_arr,
+    pct_change_arr,
+    _calculate_performance_batch,
+    _calculate_performance_batch_pruned
+)
+from combo_signals import combine_signals, _signal_from_bitmaps
 from optimizer import generate_param_dicts, STRATEGY_FUNCTIONS, signal_cache
 
+# The meta (overtrading) grid shared by every optimizer in this module
+META_PARAM_GRID = {
+    "penalty_factor": PENALTY_FACTOR_GRID,
+    "min_holding_period": MIN_HOLDING_PERIOD_GRID,
+    "sharpe_ratio_weight": SHARPE_RATIO_WEIGHT_GRID
+}
+
+# Shared sentinel for strategies without a grid, so cache keys built on the
+# grid object's identity stay stable across calls
+_EMPTY_GRID = {}
+
+# Param-dict expansion cache: the same (strategy, grid) pair is expanded only
+# once per run even when many combos share a strategy. Keyed by grid content
+# so temporary grids (the coarse/refine stages) hash safely.
+_param_cache = {}
+
+def _get_param_dicts(sname, grid_dict):
+    key = (sname, tuple(sorted((k, tuple(v)) for k, v in grid_dict.items())))
+    if key not in _param_cache:
+        _param_cache[key] = list(generate_param_dicts(grid_dict)) or [{}]
+    return _param_cache[key]
+
+def _coarse_param_grids(strategy_names, param_grids):
+    """Subsample every grid list to every other value for the coarse stage."""
+    return {
+        sname: {k: list(v)[::2] for k, v in param_grids.get(sname, _EMPTY_GRID).items()}
+        for sname in strategy_names
+    }
+
+def _refined_param_grids(strategy_names, param_grids, best_strategy_params):
+    """
+    Slice each full grid down to the +-1-index neighborhood of the value the
+    coarse stage picked; parameters whose best value is not in the full grid
+    keep the full list.
+    """
+    fine = {}
+    for sname in strategy_names:
+        grid = param_grids.get(sname, _EMPTY_GRID)
+        best = best_strategy_params.get(sname, {})
+        refined = {}
+        for k, values in grid.items():
+            values = list(values)
+            if best.get(k) in values:
+                i = values.index(best[k])
+                refined[k] = values[max(0, i - 1):i + 2]
+            else:
+                refined[k] = values
+        fine[sname] = refined
+    return fine
+
+# Fixed schema for optimizer result rows; rows are plain tuples in this order
+# so pd.DataFrame never has to infer per-row dict keys
+RESULT_COLUMNS = [
+    "StrategyCombo", "BuyOperator", "SellOperator", "BestParams",
+    "TrainPerformance", "FinalPortfolioValue", "NumberOfTrades"
+]
+
+# Cross-combo memoization: many of the STRATEGY_COMBINATIONS share
+# sub-strategies and grids, so the same combined signal shows up again and
+# again. Both results also depend on the price frame - these dicts outlive
+# a single frame (and joblib reuses worker processes across currencies) -
+# so the key is a fast xxhash digest of the signal bytes with a content
+# hash of the prices folded in: identical signal bytes on two same-length
+# frames must not collide. Plain dicts with a FIFO size cap (lru_cache
+# can't key on ndarrays).
+_MEMO_MAX_ENTRIES = 4096
+_sharpe_memo = {}    # signal_hash ^ frame_hash -> sharpe
+_backtest_memo = {}  # (signal_hash ^ frame_hash, min_holding_period) -> (perf, val, trades)
+
+def _memo_put(memo, key, value):
+    if len(memo) >= _MEMO_MAX_ENTRIES:
+        memo.pop(next(iter(memo)))
+    memo[key] = value
+
+def _build_signal_pool(df, strategy_names, strategy_param_sets):
+    """
+    Materialize every (strategy, param set) signal as a row of one
+    contiguous (total_param_sets, N) int8 array. A single allocation with
+    per-strategy row offsets replaces the list-of-arrays layout, so the
+    combo loop touches the pool with plain integer row indexing and good
+    cache locality.
+
+    Each row is also bit-packed once into buy/sell bitmaps (bit set where
+    the signal is +1 / -1). Combining K strategies then reduces to K-1
+    bitwise ands/ors over N/8 bytes instead of scanning the N*K int8
+    matrix - NumPy vectorizes the reduction into wide SIMD ops.
+    """
+    n = len(df)
+    total_rows = sum(len(p) for p in strategy_param_sets)
+    signal_pool = np.empty((total_rows, n), dtype=np.int8)
+    buy_bits = np.zeros((total_rows, (n + 7) // 8), dtype=np.uint8)
+    sell_bits = np.zeros_like(buy_bits)
+    row_offsets = []
+    row = 0
+    for i, sname in enumerate(strategy_names):
+        row_offsets.append(row)
+        for params in strategy_param_sets[i]:
+            sig = signal_cache.get(sname, df, **params).to_numpy(dtype=np.int8)
+            signal_pool[row, :] = sig
+            buy_bits[row, :] = np.packbits(sig == 1)
+            sell_bits[row, :] = np.packbits(sig == -1)
+            row += 1
+    return signal_pool, row_offsets, buy_bits, sell_bits
+
+def _stack_combo_signals(pool, row_offsets, combo_index_tuples,
+                         buy_operator, sell_operator, returns_arr,
+                         frame_hash):
+    """
+    Combine the per-strategy signals for every combo tuple and stack the
+    *unique* combined signals into (N, U) position/change matrices for the
+    batch kernel, deduplicating by signal hash (different param combos -
+    and different combos entirely - often collapse to the same final
+    signal). Returns the matrices, the per-unique-column Sharpe array and
+    hashes, and the combo -> unique-column index map.
+
+    frame_hash is a content hash of the price frame; it is folded into
+    every signal hash so the cross-frame _sharpe_memo/_backtest_memo
+    entries never alias between frames.
+
+    Combining runs on the bit-packed pool: AND/OR across K strategies is a
+    bitwise reduce over K buy (resp. sell) bitmaps at 8 bars per byte,
+    then one decode/ffill pass - instead of scanning the N*K int8 matrix
+    per combo.
+    """
+    signal_pool, buy_bits, sell_bits = pool
+    # The Sharpe pass is memory-bound over the bar count; float32 returns
+    # halve its cache footprint and are plenty of precision for a ratio of
+    # moments (portfolio values elsewhere stay float64)
+    returns_f32 = np.asarray(returns_arr, dtype=np.float32)
+    n = len(returns_f32)
+    n_strategies = len(row_offsets)
+    buy_is_and = buy_operator == "AND"
+    sell_is_and = sell_operator == "AND"
+    strat_returns = np.empty(n, dtype=np.float32)
+
+    col_of_combo = np.empty(len(combo_index_tuples), dtype=np.int64)
+    unique_col = {}
+    unique_signals = []
+    unique_hashes = []
+    sharpes = []
+
+    for k, index_tuple in enumerate(combo_index_tuples):
+        # Pure integer row lookups into the contiguous pool; no key
+        # construction or hashing of params in this loop
+        rows = [row_offsets[i] + index_tuple[i] for i in range(n_strategies)]
+
+        buy_reduced = (np.bitwise_and.reduce(buy_bits[rows], axis=0)
+                       if buy_is_and else
+                       np.bitwise_or.reduce(buy_bits[rows], axis=0))
+        sell_reduced = (np.bitwise_and.reduce(sell_bits[rows], axis=0)
+                        if sell_is_and else
+                        np.bitwise_or.reduce(sell_bits[rows], axis=0))
+        final_signal = _signal_from_bitmaps(buy_reduced, sell_reduced, n)
+        h = xxhash.xxh3_64_intdigest(final_signal.tobytes()) ^ frame_hash
+        u = unique_col.get(h)
+        if u is None:
+            u = len(unique_signals)
+            unique_col[h] = u
+            unique_signals.append(final_signal)
+            unique_hashes.append(h)
+
+            # Sharpe depends only on the combined signal; memoized across
+            # combos within this process
+            sharpe = _sharpe_memo.get(h)
+            if sharpe is None:
+                position = final_signal.astype(np.float32)
+                if n > 0:
+                    strat_returns[0] = 0.0
+                    strat_returns[1:] = position[:-1] * returns_f32[1:]
+                std_dev = strat_returns.std(ddof=1)
+                sharpe = float(strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
+                _memo_put(_sharpe_memo, h, sharpe)
+            sharpes.append(sharpe)
+        col_of_combo[k] = u
+
+    n_unique = len(unique_signals)
+    positions_2d = np.empty((n, n_unique), dtype=np.int8)
+    pos_change_2d = np.empty((n, n_unique), dtype=np.int8)
+    for u, final_signal in enumerate(unique_signals):
+        positions_2d[:, u] = final_signal
+        pos_change_2d[0, u] = 0
+        pos_change_2d[1:, u] = final_signal[1:] - final_signal[:-1]
+
+    return (positions_2d, pos_change_2d,
+            np.asarray(sharpes, dtype=np.float64), unique_hashes, col_of_combo)
+
+def _batch_backtest_memoized(prices, positions_2d, pos_change_2d,
+                             initial_capital, min_holding_period, unique_hashes,
+                             suffix_growth=None, perf_floors=None):
+    """
+    Run the batch backtest kernel over the unique-signal matrix, skipping
+    columns whose (signal_hash, min_holding_period) result is already
+    memoized from an earlier combo.
+
+    When suffix_growth/perf_floors are given, missing columns go through
+    the branch-and-bound kernel instead: columns provably unable to beat
+    their floor return -inf and are not memoized (the sentinel depends on
+    the incumbent best score, not just the signal).
+    """
+    n_unique = positions_2d.shape[1]
+    perfs = np.empty(n_unique, dtype=np.float64)
+    portfolio_vals = np.empty(n_unique, dtype=np.float64)
+    trade_counts = np.empty(n_unique, dtype=np.int64)
+
+    missing = []
+    for u, h in enumerate(unique_hashes):
+        cached = _backtest_memo.get((h, min_holding_period))
+        if cached is None:
+            missing.append(u)
+        else:
+            perfs[u], portfolio_vals[u], trade_counts[u] = cached
+
+    if missing:
+        cols = np.asarray(missing, dtype=np.int64)
+        if suffix_growth is not None and perf_floors is not None:
+            m_perfs, m_vals, m_trades = _calculate_performance_batch_pruned(
+                prices,
+                np.ascontiguousarray(positions_2d[:, cols]),
+                np.ascontiguousarray(pos_change_2d[:, cols]),
+                initial_capital, FEE_FACTOR, min_holding_period,
+                suffix_growth, perf_floors[cols]
+            )
+        else:
+            m_perfs, m_vals, m_trades = _calculate_performance_batch(
+                prices,
+                np.ascontiguousarray(positions_2d[:, cols]),
+                np.ascontiguousarray(pos_change_2d[:, cols]),
+                initial_capital, FEE_FACTOR, min_holding_period
+            )
+        perfs[cols] = m_perfs
+        portfolio_vals[cols] = m_vals
+        trade_counts[cols] = m_trades
+        for j, u in enumerate(missing):
+            if np.isfinite(m_perfs[j]):
+                _memo_put(_backtest_memo,
+                          (unique_hashes[u], min_holding_period),
+                          (m_perfs[j], m_vals[j], m_trades[j]))
+
+    return perfs, portfolio_vals, trade_counts
+
+def _perfect_foresight_growth(prices):
+    """
+    suffix_growth[i]: growth factor of a portfolio perfectly positioned
+    (long or short, no fees) over bars i..N-1 - the optimistic bound the
+    pruned batch kernel checks against. Length N+1 with a trailing 1.0.
+    """
+    n = len(prices)
+    abs_rets = np.zeros(n + 1, dtype=np.float64)
+    if n > 1:
+        abs_rets[1:n] = np.abs(prices[1:] / prices[:-1] - 1.0)
+    return np.cumprod((1.0 + abs_rets)[::-1])[::-1]
+
+# Module-level worker state, set once per pool worker by the initializer so
+# the price frame and returns are not re-pickled for every submitted task.
+_worker_df = None
+_worker_returns = None
+
+def _init_worker(df, precomputed_returns):
+    global _worker_df, _worker_returns
+    _worker_df = df
+    _worker_returns = precomputed_returns
+    # Load the JIT kernels from the shared cache before the first task
+    from optimizer import _warmup_kernels
+    _warmup_kernels()
+
+def _optimize_one_single_strategy(df, strategy_name, params_dict, initial_capital, precomputed_returns):
+    """Evaluate the full (strategy params x meta params) grid for one strategy."""
+    prices = np.ascontiguousarray(df["close_price"].to_numpy(dtype=np.float64))
+    returns_f32 = np.ascontiguousarray(precomputed_returns, dtype=np.float32)
+
+    strategy_param_combos = _get_param_dicts(strategy_name, params_dict)
+    meta_param_dicts = _get_param_dicts("__meta__", META_PARAM_GRID)
+
+    # Meta grid flattened to arrays once, in meta_param_dicts order, so
+    # scoring is a single vectorized expression + argmax per param set
+    mhps = [m["min_holding_period"] for m in meta_param_dicts]
+    w_arr = np.array([m["sharpe_ratio_weight"] for m in meta_param_dicts])
+    pen_arr = np.array([m["penalty_factor"] for m in meta_param_dicts])
+
+    best_score = float("-inf")
+    best_params = {}
+    best_val = 0
+    best_num_trades = 0
+
+    # Hoist every signal out of the grid loops as an integer-indexed list
+    # of int8 arrays; no signal_cache lookups (kwargs dict, param-key
+    # hashing, frame hashing) happen once the sweep starts
+    signals = [
+        signal_cache.get(strategy_name, df, **strat_params).to_numpy(dtype=np.int8)
+        for strat_params in strategy_param_combos
+    ]
+
+    # Nested loops
+    for p_idx, strat_params in enumerate(strategy_param_combos):
+        sig_arr = signals[p_idx]
+
+        # Sharpe depends only on the signal, not on any meta parameter -
+        # compute it once instead of once per meta cell, on float32
+        # returns (half the bandwidth, ample precision for the ratio)
+        sig_f = sig_arr.astype(np.float32)
+        strat_returns = np.empty_like(returns_f32)
+        if strat_returns.size:
+            strat_returns[0] = 0.0
+            strat_returns[1:] = sig_f[:-1] * returns_f32[1:]
+        std_dev = strat_returns.std(ddof=1)
+        sharpe = float(strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
+
+        # perf/val/trades depend only on min_holding_period, not on the
+        # Sharpe weight or penalty, so backtest each unique value once
+        result_by_mhp = {}
+        for mhp in mhps:
+            if mhp not in result_by_mhp:
+                result_by_mhp[mhp] = backtest_strategy_arr(
+                    prices, sig_arr, initial_capital, mhp
+                )
+
+        # Score the whole meta grid in one vectorized expression; argmax
+        # keeps the first (earliest meta dict) winner on ties, matching
+        # the old scalar loop
+        perf_arr = np.array([result_by_mhp[m][0] for m in mhps])
+        trades_arr = np.array([result_by_mhp[m][2] for m in mhps])
+        scores = (1 - w_arr)*perf_arr + w_arr*sharpe - pen_arr*trades_arr
+
+        j = int(np.argmax(scores))
+        if scores[j] > best_score:
+            best_score = float(scores[j])
+            best_val = result_by_mhp[mhps[j]][1]
+            best_num_trades = int(trades_arr[j])
+            best_params = {
+                "strategy_params": strat_params,
+                "meta_params": meta_param_dicts[j]
+            }
+
+    return ([strategy_name], None, None, best_params, best_score, best_val, best_num_trades)
+
+def _single_strategy_task(args):
+    strategy_name, params_dict, initial_capital = args
+    return _optimize_one_single_strategy(
+        _worker_df, strategy_name, params_dict, initial_capital, _worker_returns
+    )
+
 def optimize_single_strategies(
     df: pd.DataFrame,
     strategy_param_grid: Dict[str, Dict],
     initial_capital: float = 10000,
-    precomputed_returns: pd.Series = None
-) -> pd.DataFrame:
+    precomputed_returns: pd.Series = None,
+    max_workers: int = None,
+    test_df: pd.DataFrame = None
+):
     """
     Optimized version of single strategy optimization with more efficient operations.
+    Each strategy's grid is independent, so they are dispatched across a process
+    pool (max_workers=1 forces the sequential path).
+
+    When test_df is given, each winner's test-set signal is computed
+    here as well - while its params are in scope and the strategy code
+    is hot - and returned alongside the results as
+    {(strategy_name, sorted params tuple): int8 array}, so the test
+    phase reuses them instead of re-dispatching per row.
     """
-    results = []
-    
-    # Cache frequently accessed data
-    close_prices = df["close_price"]
-    
     # Ensure returns are precomputed
     if precomputed_returns is None:
-        precomputed_returns = close_prices.pct_change().fillna(0)
-    
-    # Global meta-param combos - generate once outside the loop
-    meta_param_dicts = generate_param_dicts({
-        "penalty_factor": PENALTY_FACTOR_GRID,
-        "min_holding_period": MIN_HOLDING_PERIOD_GRID,
-        "sharpe_ratio_weight": SHARPE_RATIO_WEIGHT_GRID
-    })
-
-    for strategy_name in STRATEGY_FUNCTIONS.keys():
-        params_dict = strategy_param_grid.get(strategy_name, {})
-        strategy_param_combos = generate_param_dicts(params_dict)
-
-        best_score = float("-inf")
-        best_params = {}
-        best_val = 0
-        best_num_trades = 0
-
-        # Nested loops
-        for strat_params in strategy_param_combos:
-            for meta_params in meta_param_dicts:
-                # Build signal - use cached version
-                signal = signal_cache.get(strategy_name, df, **strat_params)
-                
-                # Create a minimal DataFrame with only required columns
-                backtest_df = pd.DataFrame({"close_price": close_prices, "signal": signal})
-                
-                # Backtest
-                perf, portfolio_val, num_trades = backtest_strategy(
-                    backtest_df,
-                    initial_capital=initial_capital,
-                    min_holding_period=meta_params["min_holding_period"],
-                    precomputed_returns=precomputed_returns
-                )
+        precomputed_returns = pct_change_arr(df["close_price"].to_numpy(dtype=np.float64))
+
+    if max_workers is None:
+        max_workers = os.cpu_count()
+
+    strategy_names = list(STRATEGY_FUNCTIONS.keys())
+    tasks = [
+        (sname, strategy_param_grid.get(sname, {}), initial_capital)
+        for sname in strategy_names
+    ]
 
-                # Compute Sharpe
-                shifted_pos = signal.shift(1, fill_value=0)
-                strat_returns = shifted_pos * precomputed_returns
-                std_dev = strat_returns.std()
-                sharpe = (strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
-
-                # Final score
-                w = meta_params["sharpe_ratio_weight"]
-                penalty = meta_params["penalty_factor"]
-                score = (1 - w)*perf + (w*sharpe) - (penalty*num_trades)
-
-                # Track best
-                if score > best_score:
-                    best_score = score
-                    best_val = portfolio_val
-                    best_num_trades = num_trades
-                    best_params = {
-                        "strategy_params": strat_params,
-                        "meta_params": meta_params
-                    }
-
-        results.append({
-            "StrategyCombo": [strategy_name],
-            "BuyOperator": None,
-            "SellOperator": None,
-            "BestParams": best_params,
-            "TrainPerformance": best_score,
-            "FinalPortfolioValue": best_val,
-            "NumberOfTrades": best_num_trades
-        })
-
-    return pd.DataFrame(results)
+    if max_workers <= 1 or len(tasks) <= 1:
+        results = [
+            _optimize_one_single_strategy(df, sname, params_dict, initial_capital, precomputed_returns)
+            for sname, params_dict, _ in tasks
+        ]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(max_workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(df, precomputed_returns)
+        ) as executor:
+            results = list(executor.map(_single_strategy_task, tasks))
+
+    train_results = pd.DataFrame(results, columns=RESULT_COLUMNS)
+    if test_df is None:
+        return train_results
+
+    test_signals = {}
+    for result in results:
+        sname = result[0][0]
+        strat_params = result[3].get("strategy_params", {})
+        key = (sname, tuple(sorted(strat_params.items())))
+        test_signals[key] = signal_cache.get(
+            sname, test_df, **strat_params
+        ).to_numpy(dtype=np.int8)
+    return train_results, test_signals
 
 def optimize_strategy_combo(
     df: pd.DataFrame, 
@@ -112,98 +438,81 @@ def optimize_strategy_combo(
     """
     Optimized version of strategy combo evaluation.
     """
-    # Extract parameter combinations for each strategy
-    strategy_param_combos = []
-    for sname in strategy_names:
-        param_dicts = generate_param_dicts(param_grids.get(sname, {}))
-        if not param_dicts:
-            param_dicts = [{}]
-        strategy_param_combos.append(param_dicts)
+    # Extract parameter combinations for each strategy (cached per grid)
+    strategy_param_combos = [
+        _get_param_dicts(sname, param_grids.get(sname, _EMPTY_GRID))
+        for sname in strategy_names
+    ]
 
     # Meta parameter combinations
-    meta_param_dicts = generate_param_dicts({
-        "penalty_factor": PENALTY_FACTOR_GRID,
-        "min_holding_period": MIN_HOLDING_PERIOD_GRID,
-        "sharpe_ratio_weight": SHARPE_RATIO_WEIGHT_GRID
-    })
-    
+    meta_param_dicts = _get_param_dicts("__meta__", META_PARAM_GRID)
+
     # Cache close prices and ensure returns are precomputed
     close_prices = df["close_price"]
     if precomputed_returns is None:
-        precomputed_returns = close_prices.pct_change().fillna(0)
+        precomputed_returns = pct_change_arr(close_prices.to_numpy(dtype=np.float64))
 
     best_params_combo = None
     best_score = float("-inf")
     best_portfolio_value = 0
     best_num_trades = 0
 
-    # Precompute signals for each strategy/param combination to avoid duplicated calculations
-    precomputed_signals = {}
-    for i, sname in enumerate(strategy_names):
-        precomputed_signals[sname] = {}
-        for param_dict in strategy_param_combos[i]:
-            param_key = tuple(sorted(param_dict.items()))
-            precomputed_signals[sname][param_key] = signal_cache.get(sname, df, **param_dict)
-    
-    # Loop through parameter combinations
-    combo_count = 0
-    total_combos = len(meta_param_dicts) * np.prod([len(combos) for combos in strategy_param_combos])
-    
+    # Precompute signals for each strategy/param combination exactly once
+    # into one contiguous int8 pool (plus bit-packed buy/sell bitmaps),
+    # indexed by per-strategy row offsets so combo lookups are plain
+    # integer indexing with no hashing
+    signal_pool, row_offsets, buy_bits, sell_bits = _build_signal_pool(
+        df, strategy_names, strategy_param_combos
+    )
+
+
+    # Stack the unique combined signals into a (N, U) matrix so that one
+    # Numba-parallel kernel can backtest all parameter combinations per
+    # meta parameter set instead of looping them in Python; duplicate
+    # combined signals collapse to a single column. Only the index-tuple
+    # product is materialized (small int tuples, needed once for stacking
+    # and once to decode the winner) - the Cartesian product of the param
+    # dicts themselves is never built.
+    combo_index_tuples = list(itertools.product(*[range(len(c)) for c in strategy_param_combos]))
+    prices = close_prices.to_numpy(dtype=np.float64)
+    returns_arr = np.asarray(precomputed_returns, dtype=np.float64)
+    frame_hash = xxhash.xxh3_64_intdigest(prices.tobytes())
+
+    positions_2d, pos_change_2d, sharpes, unique_hashes, col_of_combo = \
+        _stack_combo_signals(
+            (signal_pool, buy_bits, sell_bits), row_offsets, combo_index_tuples,
+            buy_operator, sell_operator, returns_arr, frame_hash
+        )
+
     for meta_params in meta_param_dicts:
-        for combo_tuple in itertools.product(*strategy_param_combos):
-            combo_count += 1
-            if combo_count % 100 == 0:
-                print(f"Processing combo {combo_count}/{total_combos} for {strategy_names}")
-            
-            # Build multi-strategy signals
-            signal_dfs = []
+        perfs, portfolio_vals, trade_counts = _batch_backtest_memoized(
+            prices, positions_2d, pos_change_2d,
+            initial_capital, meta_params["min_holding_period"], unique_hashes
+        )
+
+        # Score every combo at once (expand unique columns back to combos
+        # so ties keep resolving to the first combo in product order)
+        w = meta_params["sharpe_ratio_weight"]
+        penalty = meta_params["penalty_factor"]
+        scores = ((1 - w)*perfs + w*sharpes - penalty*trade_counts)[col_of_combo]
+        portfolio_vals = portfolio_vals[col_of_combo]
+        trade_counts = trade_counts[col_of_combo]
+
+        k = int(np.argmax(scores))
+        if scores[k] > best_score:
+            best_score = float(scores[k])
+            best_portfolio_value = float(portfolio_vals[k])
+            best_num_trades = int(trade_counts[k])
+
+            # Build param dict, decoding the winner from its index tuple
+            param_set_dict = {}
             for i, sname in enumerate(strategy_names):
-                strat_params = combo_tuple[i]
-                param_key = tuple(sorted(strat_params.items()))
-                
-                # Get precomputed signal
-                s_signal = precomputed_signals[sname][param_key]
-                signal_dfs.append(pd.DataFrame({"signal": s_signal}, index=df.index))
-
-            # Combine signals
-            final_signal = combine_signals(signal_dfs, buy_operator=buy_operator, sell_operator=sell_operator)
-
-            # Backtest
-            perf, portfolio_val, num_trades = backtest_strategy(
-                pd.DataFrame({"close_price": close_prices, "signal": final_signal}),
-                initial_capital=initial_capital,
-                min_holding_period=meta_params["min_holding_period"],
-                precomputed_returns=precomputed_returns
-            )
+                param_set_dict[sname] = strategy_param_combos[i][combo_index_tuples[k][i]]
 
-            # Compute Sharpe
-            strat_returns = final_signal.shift(1, fill_value=0) * precomputed_returns
-            std_dev = strat_returns.std()
-            sharpe = (strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
-
-            # Calculate score
-            w = meta_params["sharpe_ratio_weight"]
-            penalty = meta_params["penalty_factor"]
-            score = (1 - w)*perf + (w*sharpe) - (penalty*num_trades)
-
-            if score > best_score:
-                best_score = score
-                best_portfolio_value = portfolio_val
-                best_num_trades = num_trades
-                
-                # Build param dict
-                param_set_dict = {}
-                for i, sname in enumerate(strategy_names):
-                    param_set_dict[sname] = combo_tuple[i]
-                    
-                best_params_combo = {
-                    "Strategies": param_set_dict,
-                    "Meta": meta_params
-                }
-    
-    # Clean up to free memory
-    precomputed_signals.clear()
-    gc.collect()
+            best_params_combo = {
+                "Strategies": param_set_dict,
+                "Meta": meta_params
+            }
 
     return best_params_combo, best_score, best_portfolio_value, best_num_trades
 
@@ -214,23 +523,38 @@ def optimize_strategy_combo_improved(
     buy_operator: str,
     sell_operator: str,
     initial_capital: float = 10000,
-    precomputed_returns: pd.Series = None
+    precomputed_returns: pd.Series = None,
+    prune: bool = False
 ):
     """
-    Further optimized version with early pruning of unpromising combinations
+    Further optimized version with early pruning of unpromising combinations.
+
+    With prune=True the later meta passes additionally run the
+    branch-and-bound batch kernel: a column is abandoned mid-backtest once
+    even perfect positioning over the remaining bars cannot lift its score
+    above the incumbent best. The bound is conservative (it ignores fees
+    and the trade penalty), so the winning combo is unaffected; pruned
+    losers simply report -inf instead of their exact score.
+
+    Every (meta_params, combo_tuple) cell of the grid is independent, so the
+    full evaluation is embarrassingly parallel. optimize_all_combinations
+    already fans the combos out across a process pool, so rather than nesting
+    a second pool here the per-combo work is batched into a single
+    Numba-parallel kernel call per meta parameter set, which spreads the
+    combos across cores without any pickling overhead.
     """
     # Ensure returns are precomputed
     close_prices = df["close_price"]
     if precomputed_returns is None:
-        precomputed_returns = close_prices.pct_change().fillna(0)
-    
+        precomputed_returns = pct_change_arr(close_prices.to_numpy(dtype=np.float64))
+
     # Extract parameters for each strategy
     strategy_param_sets = []
     for sname in strategy_names:
-        param_dicts = generate_param_dicts(param_grids.get(sname, {}))
+        param_dicts = _get_param_dicts(sname, param_grids.get(sname, _EMPTY_GRID))
         if not param_dicts:
             # Use default params from STRATEGY_PARAM_GRID instead of empty dict
-            param_dicts = generate_param_dicts(STRATEGY_PARAM_GRID.get(sname, {}))
+            param_dicts = _get_param_dicts(sname, STRATEGY_PARAM_GRID.get(sname, _EMPTY_GRID))
             if not param_dicts:  # If still empty, use a minimal default
                 if sname == "moving_average_crossover":
                     param_dicts = [{"short_window": 10, "long_window": 50}]
@@ -253,145 +577,136 @@ def optimize_strategy_combo_improved(
         strategy_param_sets.append(param_dicts)
     
     # Generate meta parameter combinations
-    meta_param_dicts = generate_param_dicts({
-        "penalty_factor": PENALTY_FACTOR_GRID,
-        "min_holding_period": MIN_HOLDING_PERIOD_GRID,
-        "sharpe_ratio_weight": SHARPE_RATIO_WEIGHT_GRID
-    })
-    
-    # Precompute individual strategy signals to reuse
-    strategy_signals = {}
-    for i, sname in enumerate(strategy_names):
-        strategy_signals[sname] = {}
-        for params in strategy_param_sets[i]:
-            params_tuple = tuple(sorted((k, v) for k, v in params.items()))
-            strategy_signals[sname][params_tuple] = signal_cache.get(sname, df, **params)
-    
-    best_params_combo = None
-    best_score = float("-inf")
-    best_portfolio_value = 0
-    best_num_trades = 0
-    
+    meta_param_dicts = _get_param_dicts("__meta__", META_PARAM_GRID)
+
+    # Precompute individual strategy signals once into the contiguous int8
+    # pool and bitmaps (same layout as optimize_strategy_combo)
+    signal_pool, row_offsets, buy_bits, sell_bits = _build_signal_pool(
+        df, strategy_names, strategy_param_sets
+    )
+
+    prices = close_prices.to_numpy(dtype=np.float64)
+    returns_arr = np.asarray(precomputed_returns, dtype=np.float64)
+    n = len(prices)
+    signals_mat = np.empty((n, len(strategy_names)), dtype=np.int8)
+
     # First, test each meta param set with default strategy params
     # This allows us to quickly identify promising meta param sets
     promising_meta_params = []
-    
+
     # Use first parameter set for each strategy instead of empty dict
-    default_params = [strategy_param_sets[i][0] for i in range(len(strategy_names))]
-    
+    for i in range(len(strategy_names)):
+        signals_mat[:, i] = signal_pool[row_offsets[i]]
+    default_signal = combine_signals(signals_mat, buy_operator=buy_operator, sell_operator=sell_operator)
+
     for meta_params in meta_param_dicts:
-        signal_dfs = []
-        for i, sname in enumerate(strategy_names):
-            params = default_params[i]
-            params_tuple = tuple(sorted((k, v) for k, v in params.items()))
-            s_signal = strategy_signals[sname][params_tuple]
-            signal_dfs.append(pd.DataFrame({"signal": s_signal}, index=df.index))
-        
-        final_signal = combine_signals(signal_dfs, buy_operator=buy_operator, sell_operator=sell_operator)
-        
-        # Quick backtest
-        perf, _, _ = backtest_strategy(
-            pd.DataFrame({"close_price": close_prices, "signal": final_signal}),
+        # Quick backtest on the plain arrays - no DataFrame round-trip
+        perf, _, _ = backtest_strategy_arr(
+            prices, default_signal,
             initial_capital=initial_capital,
-            min_holding_period=meta_params["min_holding_period"],
-            precomputed_returns=precomputed_returns
+            min_holding_period=meta_params["min_holding_period"]
         )
-        
+
         # If performance is decent, consider this meta param set promising
         if perf > -0.1:  # Adjust threshold as needed
             promising_meta_params.append(meta_params)
-    
+
     # If no promising meta params found, use all
     if not promising_meta_params:
         promising_meta_params = meta_param_dicts
-    
-    # Now evaluate full parameter grid only for promising meta params
+
+    # Now evaluate the full parameter grid only for promising meta params:
+    # stack the unique combined signals into a (N, U) matrix so one
+    # batch-kernel call per meta param set backtests all combos in parallel.
+    # Only the index-tuple product is materialized; the param-dict product
+    # is decoded lazily for the winner.
+    combo_index_tuples = list(itertools.product(*[range(len(p)) for p in strategy_param_sets]))
+    frame_hash = xxhash.xxh3_64_intdigest(prices.tobytes())
+
+    positions_2d, pos_change_2d, sharpes, unique_hashes, col_of_combo = \
+        _stack_combo_signals(
+            (signal_pool, buy_bits, sell_bits), row_offsets, combo_index_tuples,
+            buy_operator, sell_operator, returns_arr, frame_hash
+        )
+
+    best_params_combo = None
+    best_score = float("-inf")
+    best_portfolio_value = 0
+    best_num_trades = 0
+
+    suffix_growth = _perfect_foresight_growth(prices) if prune else None
+
     for meta_params in promising_meta_params:
-        # Use itertools.product for efficient parameter combinations
-        param_combinations = list(itertools.product(*strategy_param_sets))
-        
-        # Process in batches to control memory usage
-        batch_size = 100  # Adjust based on available memory
-        for i in range(0, len(param_combinations), batch_size):
-            batch = param_combinations[i:i+min(batch_size, len(param_combinations)-i)]
-            
-            for combo_tuple in batch:
-                # Build multi-strategy signals
-                signal_dfs = []
-                for i, sname in enumerate(strategy_names):
-                    strat_params = combo_tuple[i]
-                    params_tuple = tuple(sorted((k, v) for k, v in strat_params.items()))
-                    
-                    # Get the cached signal or compute it
-                    if params_tuple not in strategy_signals[sname]:
-                        strategy_signals[sname][params_tuple] = signal_cache.get(sname, df, **strat_params)
-                    
-                    s_signal = strategy_signals[sname][params_tuple]
-                    signal_dfs.append(pd.DataFrame({"signal": s_signal}, index=df.index))
-                
-                final_signal = combine_signals(signal_dfs, buy_operator=buy_operator, sell_operator=sell_operator)
-                
-                # Backtest
-                perf, portfolio_val, num_trades = backtest_strategy(
-                    pd.DataFrame({"close_price": close_prices, "signal": final_signal}),
-                    initial_capital=initial_capital,
-                    min_holding_period=meta_params["min_holding_period"],
-                    precomputed_returns=precomputed_returns
-                )
-                
-                # Compute Sharpe
-                strat_returns = final_signal.shift(1, fill_value=0) * precomputed_returns
-                std_dev = strat_returns.std()
-                sharpe = (strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
-                
-                w = meta_params["sharpe_ratio_weight"]
-                penalty = meta_params["penalty_factor"]
-                score = (1 - w)*perf + (w*sharpe) - (penalty*num_trades)
-                
-                if score > best_score:
-                    best_score = score
-                    best_portfolio_value = portfolio_val
-                    best_num_trades = num_trades
-                    
-                    # Build param dict
-                    param_set_dict = {}
-                    for i, sname in enumerate(strategy_names):
-                        param_set_dict[sname] = combo_tuple[i]
-                    
-                    best_params_combo = {
-                        "Strategies": param_set_dict,
-                        "Meta": meta_params
-                    }
-            
-            # Clean up intermediate results after each batch
-            if i % 500 == 0:
-                gc.collect()
-    
-    # Clean up
-    strategy_signals.clear()
-    gc.collect()
-    
+        w = meta_params["sharpe_ratio_weight"]
+
+        # A column can only beat the incumbent if
+        # (1-w)*perf + w*sharpe > best_score (the trade penalty only hurts),
+        # giving a per-column floor on perf whenever perf carries weight
+        perf_floors = None
+        if suffix_growth is not None and w < 1.0 and np.isfinite(best_score):
+            perf_floors = (best_score - w * sharpes) / (1.0 - w)
+
+        perfs, portfolio_vals, trade_counts = _batch_backtest_memoized(
+            prices, positions_2d, pos_change_2d,
+            initial_capital, meta_params["min_holding_period"], unique_hashes,
+            suffix_growth=suffix_growth if perf_floors is not None else None,
+            perf_floors=perf_floors
+        )
+
+        # Score every combo at once (expand unique columns back to combos
+        # so ties keep resolving to the first combo in product order)
+        penalty = meta_params["penalty_factor"]
+        scores = ((1 - w)*perfs + w*sharpes - penalty*trade_counts)[col_of_combo]
+        portfolio_vals = portfolio_vals[col_of_combo]
+        trade_counts = trade_counts[col_of_combo]
+
+        k = int(np.argmax(scores))
+        if scores[k] > best_score:
+            best_score = float(scores[k])
+            best_portfolio_value = float(portfolio_vals[k])
+            best_num_trades = int(trade_counts[k])
+
+            # Build param dict, decoding the winner from its index tuple
+            param_set_dict = {}
+            for i, sname in enumerate(strategy_names):
+                param_set_dict[sname] = strategy_param_sets[i][combo_index_tuples[k][i]]
+
+            best_params_combo = {
+                "Strategies": param_set_dict,
+                "Meta": meta_params
+            }
+
     return best_params_combo, best_score, best_portfolio_value, best_num_trades
 
-def optimize_all_combinations(
-    df: pd.DataFrame, 
-    strategy_combinations,
-    strategy_param_grid,
-    initial_capital=10000,
-    precomputed_returns: pd.Series = None
-):
-    """
-    Optimized version to iterate over strategy combinations.
-    """
-    results = []
-    
-    # Ensure returns are precomputed
-    if precomputed_returns is None:
-        precomputed_returns = df["close_price"].pct_change().fillna(0)
-    
-    for combo in strategy_combinations:
-        strategy_names, buy_op, sell_op = combo
-        
+def _optimize_one_combination(df, combo, strategy_param_grid, initial_capital,
+                              precomputed_returns, refine=False):
+    strategy_names, buy_op, sell_op = combo
+
+    if refine:
+        # Coarse-to-fine search: sweep a half-density grid first, then only
+        # the +-1 neighborhood of the coarse winner at full density. Far
+        # fewer evaluations than one fine sweep on smooth objectives; the
+        # coarse result stands if refinement finds nothing better.
+        coarse = _coarse_param_grids(strategy_names, strategy_param_grid)
+        best_params, best_score, best_val, num_trades = optimize_strategy_combo_improved(
+            df, strategy_names, coarse,
+            buy_operator=buy_op, sell_operator=sell_op,
+            initial_capital=initial_capital,
+            precomputed_returns=precomputed_returns
+        )
+        if best_params is not None:
+            fine = _refined_param_grids(
+                strategy_names, strategy_param_grid, best_params["Strategies"]
+            )
+            refined = optimize_strategy_combo_improved(
+                df, strategy_names, fine,
+                buy_operator=buy_op, sell_operator=sell_op,
+                initial_capital=initial_capital,
+                precomputed_returns=precomputed_returns
+            )
+            if refined[1] > best_score:
+                best_params, best_score, best_val, num_trades = refined
+    else:
         # Use the improved combo optimizer for better performance
         best_params, best_score, best_val, num_trades = optimize_strategy_combo_improved(
             df,
@@ -403,18 +718,58 @@ def optimize_all_combinations(
             precomputed_returns=precomputed_returns
         )
 
-        results.append({
-            "StrategyCombo": strategy_names,
-            "BuyOperator": buy_op,
-            "SellOperator": sell_op,
-            "BestParams": best_params,
-            "TrainPerformance": best_score,
-            "FinalPortfolioValue": best_val,
-            "NumberOfTrades": num_trades
-        })
-        
-        # Clean up memory periodically
-        if len(results) % 5 == 0:
-            gc.collect()
-
-    return pd.DataFrame(results)
\ No newline at end of file
+    return (strategy_names, buy_op, sell_op, best_params, best_score, best_val, num_trades)
+
+def optimize_all_combinations(
+    df: pd.DataFrame,
+    strategy_combinations,
+    strategy_param_grid,
+    initial_capital=10000,
+    precomputed_returns: pd.Series = None,
+    max_workers: int = None,
+    refine: bool = False
+):
+    """
+    Optimized version to iterate over strategy combinations. Each combination
+    is an independent, minutes-long grid search, so they are fanned out
+    across cores with joblib's loky backend (max_workers=1 forces the
+    sequential path). loky reuses its worker pool across calls and memmaps
+    large array payloads, so repeated invocations don't pay pool start-up.
+    refine=True runs each combination coarse-to-fine (half-density grid,
+    then the neighborhood of the coarse winner) instead of one full sweep.
+    """
+    # Ensure returns are precomputed
+    if precomputed_returns is None:
+        precomputed_returns = pct_change_arr(df["close_price"].to_numpy(dtype=np.float64))
+
+    if max_workers is None:
+        max_workers = os.cpu_count()
+
+    combos = list(strategy_combinations)
+
+    if max_workers <= 1 or len(combos) <= 1:
+        results = [
+            _optimize_one_combination(df, combo, strategy_param_grid, initial_capital,
+                                      precomputed_returns, refine=refine)
+            for combo in combos
+        ]
+    else:
+        # batch_size=1: the combos vary wildly in grid size, so greedy
+        # per-task dispatch keeps the workers balanced
+        results = Parallel(
+            n_jobs=min(max_workers, len(combos)),
+            backend="loky",
+            batch_size=1
+        )(
+            delayed(_optimize_one_combination)(
+                df, combo, strategy_param_grid, initial_capital,
+                precomputed_returns, refine=refine
+            )
+            for combo in combos
+        )
+
+    # One collection after the whole sweep; per-combo collects were pure
+    # overhead (full stop-the-world scans) now that the optimizers no
+    # longer churn transient DataFrames
+    gc.collect()
+    return pd.DataFrame(results, columns=RESULT_COLUMNS)
\ No newline at end of file
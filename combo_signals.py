@@ -2,39 +2,127 @@
 
 import numpy as np
 import pandas as pd
+import config  # noqa: F401  (sets NUMBA_CACHE_DIR before numba loads)
+import numba
 
-def combine_signals(signal_dfs, buy_operator="AND", sell_operator="AND"):
+# Single canonical combiner; the JIT kernels are implementation details
+__all__ = ["combine_signals"]
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _combine_and_ffill(signals_array, buy_is_and, sell_is_and):
+    """
+    Fused combine kernel: for each row, evaluate the buy/sell operator
+    across the strategy columns and carry the forward-fill state, in a
+    single sweep with one output allocation (the vectorized version made
+    three passes over the matrix: buy mask, sell mask, ffill).
+
+    Operators arrive as booleans (True = AND) so the kernel never
+    compares strings.
+    """
+    n, n_strats = signals_array.shape
+    out = np.empty(n, dtype=np.int8)
+    prev = np.int8(0)
+    for i in range(n):
+        n_buy = 0
+        n_sell = 0
+        for j in range(n_strats):
+            s = signals_array[i, j]
+            if s == 1:
+                n_buy += 1
+            elif s == -1:
+                n_sell += 1
+
+        if buy_is_and:
+            buy = n_buy == n_strats
+        else:
+            buy = n_buy > 0
+        if sell_is_and:
+            sell = n_sell == n_strats
+        else:
+            sell = n_sell > 0
+
+        # Sell takes precedence when both fire, matching the mask-based
+        # version where the sell mask was written last
+        if sell:
+            prev = np.int8(-1)
+        elif buy:
+            prev = np.int8(1)
+        # neither: hold the previous position (forward-fill of zeros)
+        out[i] = prev
+    return out
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _signal_from_bitmaps(buy_bytes, sell_bytes, n):
+    """
+    Decode reduced buy/sell bitmaps (np.packbits layout, MSB-first) into a
+    forward-filled int8 signal. Bytes where neither side fires - the
+    common case for AND-combined strategies - are emitted as an 8-bar run
+    of the held position without touching individual bits. Sell keeps
+    precedence over buy, matching _combine_and_ffill.
+    """
+    out = np.empty(n, dtype=np.int8)
+    prev = np.int8(0)
+    idx = 0
+    for w in range(buy_bytes.shape[0]):
+        b = buy_bytes[w]
+        s = sell_bytes[w]
+        if b == 0 and s == 0:
+            end = min(idx + 8, n)
+            for i in range(idx, end):
+                out[i] = prev
+            idx = end
+        else:
+            for bit in range(7, -1, -1):
+                if idx >= n:
+                    break
+                if (s >> bit) & 1:
+                    prev = np.int8(-1)
+                elif (b >> bit) & 1:
+                    prev = np.int8(1)
+                out[idx] = prev
+                idx += 1
+        if idx >= n:
+            break
+    return out
+
+def combine_signals(signals, buy_operator="AND", sell_operator="AND"):
     """
     Combine multiple strategy signals into a single final signal
     using the specified buy/sell logical operators.
     signal = +1 (buy) if buy conditions meet, -1 (sell) if sell conditions meet,
     0 otherwise, then forward-filled to hold positions.
+
+    'signals' can be a 2-D NumPy array with one column per strategy
+    (the zero-copy path used by the optimizers), or a list of
+    DataFrames with a 'signal' column / Series / 1-D arrays.
+    Returns a Series when a pandas index is available, otherwise a
+    plain int8 array.
     """
-    # Assume all have the same index
-    idx = signal_dfs[0].index
-    # Stack signals horizontally in a NumPy array
-    signals_array = np.column_stack([df["signal"].values for df in signal_dfs])
-
-    # Buy side
-    if buy_operator == "AND":
-        buy_mask = np.all(signals_array == 1, axis=1)
-    else:  # OR
-        buy_mask = np.any(signals_array == 1, axis=1)
-
-    # Sell side
-    if sell_operator == "AND":
-        sell_mask = np.all(signals_array == -1, axis=1)
-    else:  # OR
-        sell_mask = np.any(signals_array == -1, axis=1)
-
-    # Build final signal array
-    final_signal = np.zeros(len(idx), dtype=np.int8)
-    final_signal[buy_mask] = 1
-    final_signal[sell_mask] = -1
-
-    # Forward-fill any 0's
-    for i in range(1, len(final_signal)):
-        if final_signal[i] == 0:
-            final_signal[i] = final_signal[i-1]
-
-    return pd.Series(final_signal, index=idx)
+    idx = None
+    if isinstance(signals, np.ndarray) and signals.ndim == 2:
+        signals_array = signals
+    else:
+        columns = []
+        for s in signals:
+            if isinstance(s, pd.DataFrame):
+                if idx is None:
+                    idx = s.index
+                columns.append(s["signal"].values)
+            elif isinstance(s, pd.Series):
+                if idx is None:
+                    idx = s.index
+                columns.append(s.values)
+            else:
+                columns.append(np.asarray(s))
+        signals_array = np.column_stack(columns)
+
+    if signals_array.dtype != np.int8:
+        signals_array = signals_array.astype(np.int8)
+
+    final_signal = _combine_and_ffill(
+        signals_array, buy_operator == "AND", sell_operator == "AND"
+    )
+
+    if idx is not None:
+        return pd.Series(final_signal, index=idx)
+    return final_signal
@@ -1,5 +1,30 @@
 # config.py
 
+import os as _os
+from functools import reduce as _reduce
+from operator import mul as _mul
+
+# Shared on-disk cache for the Numba-compiled kernels (they are all
+# declared cache=True). Pinning NUMBA_CACHE_DIR to one absolute path
+# means every process - including joblib loky workers - reuses the same
+# compiled artifacts instead of each paying the cold JIT cost. Must be
+# set before numba is imported, and config is imported first everywhere.
+_os.environ.setdefault(
+    "NUMBA_CACHE_DIR",
+    _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), ".cache", "numba")
+)
+
+# Pin Numba's threading layer to workqueue: with tbb installed, Numba
+# prefers it for parallel=True kernels, and once a prange kernel has run
+# under tbb any later multiprocessing pool (fork or spawn) hangs the
+# interpreter at shutdown - e.g. optimize_strategy followed by
+# optimize_strategy_parallel in one process. ("forksafe" is no help: it
+# resolves to tbb first.) workqueue is Numba's always-available
+# fork-safe layer; the prange kernels here are called from one thread
+# at a time, so its single-threaded-caller restriction is fine. Like
+# the cache dir, this must be set before numba is imported.
+_os.environ.setdefault("NUMBA_THREADING_LAYER", "workqueue")
+
 DB_CONFIG = {
     'dbname': 'cryptocurrencies',
     'user': 'myuser',
@@ -23,52 +48,80 @@ INITIAL_CAPITAL = 10000
 
 TRADING_FEE_PCT = 0.001  # Example: 0.1%
 
+# Disk-backed strategy-signal cache (joblib.Memory). Signals persist here
+# across runs so reruns over the same price window skip recomputation.
+# Set to None to keep the cache purely in-memory.
+SIGNAL_CACHE_DIR = ".cache/signals"
+
+# Parquet cache of historical OHLCV fetches, keyed by (symbol, range).
+# Warm runs skip Postgres entirely. Set to None to always hit the DB.
+DATA_CACHE_DIR = ".cache/data"
+
 ############################################################
 #                  PARAMETER GRID                          #
 ############################################################
+# Grids are tuples: this module is the single source of truth for the
+# searched parameter space, and freezing the values prevents a stray
+# mutation from silently changing what later runs search.
 STRATEGY_PARAM_GRID = {
     "moving_average_crossover": {
-        "short_window": [5, 10, 20, 50],
-        "long_window": [50, 100, 200, 300, 400]
+        "short_window": (5, 10, 20, 50),
+        "long_window": (50, 100, 200, 300, 400)
     },
     "rsi": {
-        "period": [7, 14],
-        "buy_threshold": [25, 30, 35],
-        "sell_threshold": [65, 70, 75]
+        "period": (7, 14),
+        "buy_threshold": (25, 30, 35),
+        "sell_threshold": (65, 70, 75)
     },
     "bollinger_bands": {
-        "period": [14, 20],
-        "std_dev": [2, 2.5, 3]
+        "period": (14, 20),
+        "std_dev": (2, 2.5, 3)
     },
     "macd": {
-        "fast_period": [12, 20],
-        "slow_period": [26, 50],
-        "signal_period": [9, 12]
+        "fast_period": (12, 20),
+        "slow_period": (26, 50),
+        "signal_period": (9, 12)
     },
     "high_low_breakout": {
-        "lookback": [12, 24, 48]
+        "lookback": (12, 24, 48)
     },
     "volume_price_action": {
-        "volume_multiplier": [1.5, 2.0, 2.5]
+        "volume_multiplier": (1.5, 2.0, 2.5)
     },
     "vwap_zone": {
-        "rsi_period": [7, 14],
-        "rsi_lower": [40, 45, 50],
-        "rsi_upper": [55, 60, 65]
+        "rsi_period": (7, 14),
+        "rsi_lower": (40, 45, 50),
+        "rsi_upper": (55, 60, 65)
     },
     "zscore_mean_reversion": {
-        "zscore_window": [14, 20, 30],
-        "zscore_threshold": [2, 2.5, 3]
+        "zscore_window": (14, 20, 30),
+        "zscore_threshold": (2, 2.5, 3)
     }
 }
 
+# How optimize_strategy explores STRATEGY_PARAM_GRID:
+#   "grid"   - exhaustive Cartesian product (reproducible, the default)
+#   "random" - seeded sample of SEARCH_N_TRIALS points from the grid
+#   "bayes"  - optuna TPE over the grid values (needs optuna installed;
+#              falls back to "random" when it isn't)
+SEARCH_STRATEGY = "grid"
+SEARCH_N_TRIALS = 200
+
+# Grid sizes per strategy, derived at import time; lets callers order
+# combination sweeps cheapest-first (cheap combos establish a best score
+# early, which feeds the optimizers' pruning)
+STRATEGY_PARAM_COMBO_COUNTS = {
+    name: _reduce(_mul, (len(v) for v in grid.values()), 1)
+    for name, grid in STRATEGY_PARAM_GRID.items()
+}
+
 ############################################################
 #      GLOBAL (META) HYPERPARAMS TO REDUCE OVERTRADING     #
 ############################################################
 # We'll treat these as "meta-parameters" tested alongside each strategy's normal parameters.
-PENALTY_FACTOR_GRID = [0.0, 0.0005]  # Penalty per trade in your objective
-MIN_HOLDING_PERIOD_GRID = [0, 5, 10] # In hours (0 means no minimum hold)
-SHARPE_RATIO_WEIGHT_GRID = [0.0, 0.5, 1.0]
+PENALTY_FACTOR_GRID = (0.0, 0.0005)  # Penalty per trade in your objective
+MIN_HOLDING_PERIOD_GRID = (0, 5, 10) # In hours (0 means no minimum hold)
+SHARPE_RATIO_WEIGHT_GRID = (0.0, 0.5, 1.0)
 #  - 0.0 => pure returns
 #  - 1.0 => pure Sharpe ratio
 #  - 0.5 => 50% weight to Sharpe, 50% to raw returns
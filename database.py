@@ -1,8 +1,72 @@
 # database.py
 
+import hashlib
+import io
+import os
+
 import psycopg2
+import psycopg2.pool
 import pandas as pd
-from config import DB_CONFIG
+from config import DB_CONFIG, DATA_CACHE_DIR
+
+# One pool shared by every DatabaseHandler in the process, so repeated
+# handler instantiations (tester runs, per-symbol helpers) reuse live
+# connections instead of paying a fresh TCP+auth handshake each time.
+# Threaded variant so pooled handlers are safe from worker threads.
+_connection_pool = None
+
+def _get_pool():
+    global _connection_pool
+    if _connection_pool is None:
+        _connection_pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn=1, maxconn=os.cpu_count() or 4, **DB_CONFIG
+        )
+    return _connection_pool
+
+# Column layout of crypto_data_hourly fetches; float32 is plenty of
+# precision for OHLCV and halves the frame vs float64, so the dtypes are
+# applied at parse time instead of downcasting afterwards
+_DATA_COLUMNS = [
+    "date_time",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume_crypto",
+    "volume_usd",
+]
+_DATA_DTYPES = {col: "float32" for col in _DATA_COLUMNS[1:]}
+
+# Read buffer for copy_expert; the 8 KiB default means thousands of
+# reads for a 50k-row pull, 1 MiB keeps the syscall count low
+_COPY_BUFFER_SIZE = 1 << 20
+
+def _cache_path(*key_parts):
+    """Parquet cache path for a fetch key, or None when caching is off"""
+    if not DATA_CACHE_DIR:
+        return None
+    digest = hashlib.sha1("|".join(str(p) for p in key_parts).encode()).hexdigest()
+    return os.path.join(DATA_CACHE_DIR, f"{digest}.parquet")
+
+def _cache_load(path):
+    """Return the cached frame for path, or None on miss/unreadable"""
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"Ignoring unreadable data cache {path}: {str(e)}")
+        return None
+
+def _cache_store(path, df):
+    """Write df to the parquet cache; failures only cost the warm start"""
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, compression="zstd")
+    except Exception as e:
+        print(f"Could not write data cache {path}: {str(e)}")
 
 class DatabaseHandler:
     def __init__(self):
@@ -11,7 +75,7 @@ class DatabaseHandler:
 
     def connect(self):
         try:
-            self.conn = psycopg2.connect(**DB_CONFIG)
+            self.conn = _get_pool().getconn()
             print("Successfully connected to database")
         except Exception as e:
             print(f"Error connecting to database: {str(e)}")
@@ -35,33 +99,132 @@ class DatabaseHandler:
             ORDER BY date_time ASC
         """
         
+        cache_path = _cache_path(symbol, start_date, end_date)
+        cached = _cache_load(cache_path)
+        if cached is not None:
+            print(f"\nLoaded {len(cached)} hourly records for {symbol} from cache")
+            return cached
+
         try:
             print(f"\nFetching data for {symbol}:")
             print(f"Start: {start_date}")
             print(f"End: {end_date}")
-            
-            df = pd.read_sql_query(
-                query,
-                self.conn,
-                params=(symbol, start_date, end_date),
-                parse_dates=['date_time']
+
+            # Stream the result set out with COPY instead of
+            # pd.read_sql_query: the server writes CSV straight into a
+            # buffer (no per-row tuple materialization on the client)
+            # and pd.read_csv parses it with the target dtypes in one
+            # pass, so no float64 intermediate is ever allocated
+            buf = io.BytesIO()
+            with self.conn.cursor() as cur:
+                bound_query = cur.mogrify(
+                    query, (symbol, start_date, end_date)
+                ).decode()
+                cur.copy_expert(
+                    f"COPY ({bound_query}) TO STDOUT WITH CSV", buf,
+                    size=_COPY_BUFFER_SIZE
+                )
+            buf.seek(0)
+
+            df = pd.read_csv(
+                buf,
+                names=_DATA_COLUMNS,
+                dtype=_DATA_DTYPES,
+                parse_dates=["date_time"]
             )
-            
+
             # Set date_time as the DataFrame index
             df.set_index('date_time', inplace=True)
             
             print(f"Fetched {len(df)} hourly records")
             if len(df) > 0:
                 print(f"Date range: {df.index.min()} to {df.index.max()}")
-            
+
+            _cache_store(cache_path, df)
             return df
-                
+
+        except Exception as e:
+            print(f"Error fetching data: {str(e)}")
+            raise
+
+    def get_historical_data_bulk(self, symbols, start_date, end_date):
+        """
+        Fetch several symbols over one date range in a single query and
+        return {symbol: df}. One round trip instead of one per
+        (symbol, window) pair; callers slice the per-symbol frames by
+        date for train/test splits.
+        """
+        query = """
+            SELECT
+                symbol,
+                date_time,
+                open_price,
+                high_price,
+                low_price,
+                close_price,
+                volume_crypto,
+                volume_usd
+            FROM crypto_data_hourly
+            WHERE symbol = ANY(%s)
+              AND date_time >= %s::timestamp
+              AND date_time <= %s::timestamp
+            ORDER BY symbol, date_time ASC
+        """
+
+        # Per-symbol cache probe first (the keys match single-symbol
+        # fetches, so the two methods share warm data); only symbols
+        # missing from the cache go into the query
+        result = {}
+        missing = []
+        for symbol in symbols:
+            cached = _cache_load(_cache_path(symbol, start_date, end_date))
+            if cached is not None:
+                print(f"Loaded {len(cached)} hourly records for {symbol} from cache")
+                result[symbol] = cached
+            else:
+                missing.append(symbol)
+        if not missing:
+            return result
+
+        try:
+            print(f"\nFetching data for {len(missing)} symbols in one query:")
+            print(f"Start: {start_date}")
+            print(f"End: {end_date}")
+
+            buf = io.BytesIO()
+            with self.conn.cursor() as cur:
+                bound_query = cur.mogrify(
+                    query, (list(missing), start_date, end_date)
+                ).decode()
+                cur.copy_expert(
+                    f"COPY ({bound_query}) TO STDOUT WITH CSV", buf,
+                    size=_COPY_BUFFER_SIZE
+                )
+            buf.seek(0)
+
+            df = pd.read_csv(
+                buf,
+                names=["symbol"] + _DATA_COLUMNS,
+                dtype=_DATA_DTYPES,
+                parse_dates=["date_time"]
+            )
+
+            for symbol, sym_df in df.groupby("symbol", sort=False):
+                sym_df = sym_df.drop(columns="symbol").set_index("date_time")
+                result[symbol] = sym_df
+                _cache_store(_cache_path(symbol, start_date, end_date), sym_df)
+                print(f"  {symbol}: {len(sym_df)} hourly records")
+
+            return result
+
         except Exception as e:
             print(f"Error fetching data: {str(e)}")
             raise
 
     def close(self):
         if self.conn:
-            self.conn.close()
+            # Return the connection to the pool rather than tearing it
+            # down; the next handler picks it up without a reconnect
+            _get_pool().putconn(self.conn)
             self.conn = None
-            print("Database connection closed.")
+            print("Database connection returned to pool.")
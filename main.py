@@ -1,5 +1,6 @@
 # main.py
 
+import csv
 import pandas as pd
 import numpy as np
 import os
@@ -22,7 +23,7 @@ from combo_optimizer import (
 )
 from combo_signals import combine_signals
 from optimizer import STRATEGY_FUNCTIONS, signal_cache
-from backtest import backtest_strategy, buy_and_hold
+from backtest import backtest_strategy_arr, buy_and_hold, pct_change_arr
 
 def optimize_memory_usage():
     """
@@ -44,34 +45,25 @@ def optimize_dataframe(df):
     """
     Optimize DataFrame memory usage by using more efficient data types.
     """
-    # Float64 to float32 for numeric columns
-    float_cols = df.select_dtypes(include=['float64']).columns
-    for col in float_cols:
-        df[col] = df[col].astype('float32')
-    
-    # Int64 to int32 or int16 where possible
-    int_cols = df.select_dtypes(include=['int64']).columns
-    for col in int_cols:
-        min_val = df[col].min()
-        max_val = df[col].max()
-        if min_val > -32768 and max_val < 32767:
-            df[col] = df[col].astype('int16')
-        else:
-            df[col] = df[col].astype('int32')
-    
+    # Float64 to float32 for numeric columns, one astype call for all
+    float_cast = {c: np.float32 for c in df.select_dtypes(include=['float64']).columns}
+    if float_cast:
+        df = df.astype(float_cast, copy=False)
+
+    # Int64 to the minimum width that fits; pandas scans the values and
+    # picks the dtype in a single C-level pass per column
+    for col in df.select_dtypes(include=['int64']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+
     return df
 
-def process_currency(symbol, db):
-    """Process a single currency"""
+def process_currency(symbol, train_df, test_df):
+    """Process a single currency given its pre-fetched train/test data"""
     try:
         print(f"\n=== Processing {symbol} ===")
         start_time = time.time()
 
-        # 1) Fetch training + test data
-        train_df = db.get_historical_data(symbol, TRAINING_START, TRAINING_END)
-        test_df = db.get_historical_data(symbol, TESTING_START, TESTING_END)
-
-        if len(train_df) < 2 or len(test_df) < 2:
+        if train_df is None or test_df is None or len(train_df) < 2 or len(test_df) < 2:
             print(f"Skipping {symbol} due to insufficient data.")
             return None, None
 
@@ -79,18 +71,19 @@ def process_currency(symbol, db):
         train_df = optimize_dataframe(train_df)
         test_df = optimize_dataframe(test_df)
 
-        # 2) Precompute returns once for training and testing
-        # Use float32 for better memory efficiency
-        train_returns = train_df["close_price"].pct_change().fillna(0).astype('float32')
-        test_returns = test_df["close_price"].pct_change().fillna(0).astype('float32')
+        # 2) Precompute training returns once (float32 for memory); the
+        # test loop backtests through backtest_strategy_arr, which
+        # derives returns from prices in-kernel
+        train_returns = pct_change_arr(train_df["close_price"].to_numpy(dtype=np.float64)).astype(np.float32)
 
         # 3) Optimize single strategies on training - use non-parallel version
         print(f"Optimizing single strategies for {symbol}...")
-        single_df = optimize_single_strategies(
+        single_df, single_test_signals = optimize_single_strategies(
             df=train_df,
             strategy_param_grid=STRATEGY_PARAM_GRID,
             initial_capital=INITIAL_CAPITAL,
-            precomputed_returns=train_returns
+            precomputed_returns=train_returns,
+            test_df=test_df
         )
         single_df["StrategyType"] = "single"
 
@@ -116,99 +109,102 @@ def process_currency(symbol, db):
         
         # 5) Test each best strategy on the test set
         print(f"Testing optimized strategies for {symbol}...")
-        bh_perf, bh_portfolio_val = buy_and_hold(test_df, INITIAL_CAPITAL)
+        bh_perf, bh_portfolio_val = buy_and_hold(test_df["close_price"].to_numpy(), INITIAL_CAPITAL)
+
+        # Shared across every test backtest below
+        test_prices = np.ascontiguousarray(test_df["close_price"].to_numpy(dtype=np.float64))
 
         test_results = []
-        # Process testing in batches to control memory usage
-        batch_size = 10  # Number of strategies to test at once
-        
-        for i in range(0, len(train_results), batch_size):
-            batch = train_results.iloc[i:i+batch_size]
-            print(f"Testing batch {i//batch_size + 1} of {(len(train_results)-1)//batch_size + 1}")
-            
-            for _, row in batch.iterrows():
-                strategy_combo = row["StrategyCombo"]
-                buy_op = row["BuyOperator"]
-                sell_op = row["SellOperator"]
-                best_params_dict = row["BestParams"]
-
-                # Build signals for entire test set
-                if len(strategy_combo) == 1:
-                    # Single strategy
-                    sname = strategy_combo[0]
-                    if isinstance(best_params_dict, dict):
-                        if "Strategies" in best_params_dict:
-                            # For single combos, might appear if stored that way
-                            strat_params = best_params_dict["Strategies"].get(sname, {})
-                        else:
-                            strat_params = best_params_dict.get("strategy_params", {})
+        # itertuples instead of iterrows: no per-cell boxing into Series,
+        # and per-strategy signal dedup happens inside signal_cache so
+        # rows sharing sub-strategy params reuse the same test signal
+        for row in train_results.itertuples(index=False):
+            strategy_combo = row.StrategyCombo
+            buy_op = row.BuyOperator
+            sell_op = row.SellOperator
+            best_params_dict = row.BestParams
+
+            # Build signals for entire test set
+            if len(strategy_combo) == 1:
+                # Single strategy
+                sname = strategy_combo[0]
+                if isinstance(best_params_dict, dict):
+                    if "Strategies" in best_params_dict:
+                        # For single combos, might appear if stored that way
+                        strat_params = best_params_dict["Strategies"].get(sname, {})
                     else:
-                        strat_params = {}
+                        strat_params = best_params_dict.get("strategy_params", {})
+                else:
+                    strat_params = {}
 
-                    # Use cached signals when possible
+                # Test signals for single winners were computed during
+                # the training pass; the cache covers any stragglers
+                signal = single_test_signals.get(
+                    (sname, tuple(sorted(strat_params.items())))
+                )
+                if signal is None:
                     signal = signal_cache.get(sname, test_df, **strat_params)
 
-                else:
-                    # Multi-strategy
-                    signal_dfs = []
-                    for sname in strategy_combo:
-                        if "Strategies" in best_params_dict:
-                            strat_params = best_params_dict["Strategies"].get(sname, {})
-                        else:
-                            strat_params = {}
+            else:
+                # Multi-strategy
+                signal_dfs = []
+                for sname in strategy_combo:
+                    if "Strategies" in best_params_dict:
+                        strat_params = best_params_dict["Strategies"].get(sname, {})
+                    else:
+                        strat_params = {}
                         
-                        # Use cached signals when possible
-                        s_signal = signal_cache.get(sname, test_df, **strat_params)
-                        signal_dfs.append(pd.DataFrame({"signal": s_signal}, index=test_df.index))
+                    # Use cached signals when possible
+                    s_signal = signal_cache.get(sname, test_df, **strat_params)
+                    signal_dfs.append(pd.DataFrame({"signal": s_signal}, index=test_df.index))
 
-                    signal = combine_signals(signal_dfs, buy_operator=buy_op, sell_operator=sell_op)
+                signal = combine_signals(signal_dfs, buy_operator=buy_op, sell_operator=sell_op)
 
-                # Backtest on test data
-                if best_params_dict and "Meta" in best_params_dict:
-                    mhp = best_params_dict["Meta"].get("min_holding_period", 0)
-                else:
-                    mhp = 0
-
-                # Create minimal DataFrame for backtest
-                backtest_df = pd.DataFrame({"close_price": test_df["close_price"], "signal": signal})
-                
-                test_perf, test_portfolio_val, num_trades = backtest_strategy(
-                    backtest_df,
-                    initial_capital=INITIAL_CAPITAL,
-                    min_holding_period=mhp,
-                    precomputed_returns=test_returns
-                )
+            # Backtest on test data
+            if best_params_dict and "Meta" in best_params_dict:
+                mhp = best_params_dict["Meta"].get("min_holding_period", 0)
+            else:
+                mhp = 0
 
-                test_results.append({
-                    "Symbol": symbol,
-                    "StrategyType": row["StrategyType"],
-                    "StrategyCombo": strategy_combo,
-                    "BuyOperator": buy_op,
-                    "SellOperator": sell_op,
-                    "BestParams": best_params_dict,
-                    "TrainPerformance": row["TrainPerformance"],
-                    "TrainFinalValue": row["FinalPortfolioValue"],
-                    "TestPerformance": test_perf,
-                    "TestFinalValue": test_portfolio_val,
-                    "NumberOfTrades": num_trades,
-                    "BuyHoldPerformance": bh_perf,
-                    "BuyHoldValue": bh_portfolio_val,
-                    "Diff_vs_BH_Perf": test_perf - bh_perf,
-                    "Diff_vs_BH_Value": test_portfolio_val - bh_portfolio_val
-                })
-            
-            # Clean up memory after each batch
-            signal_dfs = None
-            signal = None
-            gc.collect()
+            # Array backtest; the holding-period suppression runs inside
+            # the JIT kernels, no per-row DataFrame is assembled
+            test_perf, test_portfolio_val, num_trades = backtest_strategy_arr(
+                test_prices,
+                np.ascontiguousarray(np.asarray(signal, dtype=np.int8)),
+                initial_capital=INITIAL_CAPITAL,
+                min_holding_period=mhp
+            )
+
+            test_results.append({
+                "Symbol": symbol,
+                "StrategyType": row.StrategyType,
+                "StrategyCombo": strategy_combo,
+                "BuyOperator": buy_op,
+                "SellOperator": sell_op,
+                "BestParams": best_params_dict,
+                "TrainPerformance": row.TrainPerformance,
+                "TrainFinalValue": row.FinalPortfolioValue,
+                "TestPerformance": test_perf,
+                "TestFinalValue": test_portfolio_val,
+                "NumberOfTrades": num_trades,
+                "BuyHoldPerformance": bh_perf,
+                "BuyHoldValue": bh_portfolio_val,
+                "Diff_vs_BH_Perf": test_perf - bh_perf,
+                "Diff_vs_BH_Value": test_portfolio_val - bh_portfolio_val
+            })
+    
+        # One cleanup after the whole test sweep
+        gc.collect()
 
         end_time = time.time()
         print(f"Processed {symbol} in {(end_time - start_time):.2f} seconds")
         
         # Add memory optimization after completing a currency
         optimize_memory_usage()
-        
-        return train_results, pd.DataFrame(test_results)
+
+        # Plain list of row dicts; main() builds one DataFrame from all
+        # symbols at the end instead of one frame per symbol + concat
+        return train_results, test_results
     except Exception as e:
         print(f"Error processing {symbol}: {str(e)}")
         import traceback
@@ -221,40 +217,63 @@ def main():
     
     # Initialize database connection
     db = DatabaseHandler()
-    
-    all_detailed_train_results = []
-    all_test_results = []
-    
+
+    # One bulk query covers every currency across the union of the
+    # train and test windows; the per-symbol train/test frames are
+    # sliced client-side, so the DB round-trip count is 1 instead of
+    # 2 * len(CURRENCIES)
+    fetch_start = min(TRAINING_START, TESTING_START)
+    fetch_end = max(TRAINING_END, TESTING_END)
+    data_by_symbol = db.get_historical_data_bulk(CURRENCIES, fetch_start, fetch_end)
+
+    # Results stream to the CSVs one currency at a time, so peak memory
+    # is O(rows per symbol) instead of buffering every symbol until the
+    # end for one giant concat+write
+    total_train_rows = 0
+    total_test_rows = 0
+    test_writer = None
+    test_file = None
+
     # Process currencies sequentially - no parallelization
     print("Using sequential processing for all operations")
     for symbol in CURRENCIES:
         print(f"\nMemory usage before processing {symbol}: {psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024:.2f} MB")
-        train_results, test_results = process_currency(symbol, db)
+        full_df = data_by_symbol.get(symbol)
+        if full_df is None:
+            print(f"Skipping {symbol}: no data returned.")
+            continue
+        train_df = full_df.loc[TRAINING_START:TRAINING_END]
+        test_df = full_df.loc[TESTING_START:TESTING_END]
+        train_results, test_results = process_currency(symbol, train_df, test_df)
         if train_results is not None and test_results is not None:
-            all_detailed_train_results.append(train_results)
-            all_test_results.append(test_results)
-        
+            train_results.to_csv(
+                "detailed_training_results.csv", index=False,
+                mode="w" if total_train_rows == 0 else "a",
+                header=total_train_rows == 0
+            )
+            total_train_rows += len(train_results)
+
+            if test_results:
+                if test_writer is None:
+                    test_file = open("detailed_testing_results.csv", "w", newline="")
+                    test_writer = csv.DictWriter(test_file, fieldnames=list(test_results[0].keys()))
+                    test_writer.writeheader()
+                test_writer.writerows(test_results)
+                test_file.flush()
+                total_test_rows += len(test_results)
+
         # Force memory cleanup between currencies
         train_results = None
         test_results = None
         signal_cache.cache.clear()  # Clear the signal cache
         gc.collect()
-    
-    # Save results to CSV
-    if all_detailed_train_results:
-        detailed_train_df = pd.concat(all_detailed_train_results, ignore_index=True)
-        detailed_train_df.to_csv("detailed_training_results.csv", index=False)
-        print("\n=== Detailed Training Results (All Symbols) ===")
-        print(detailed_train_df.head(10))  # Only show first 10 rows to save memory in console
-        print(f"Total training results: {len(detailed_train_df)} rows")
-
-    if all_test_results:
-        test_results_df = pd.concat(all_test_results, ignore_index=True)
-        test_results_df.to_csv("detailed_testing_results.csv", index=False)
-        print("\n=== Detailed Testing Results (All Symbols) ===")
-        print(test_results_df.head(10))  # Only show first 10 rows
-        print(f"Total test results: {len(test_results_df)} rows")
-    
+
+    if test_file is not None:
+        test_file.close()
+
+    print(f"\nTotal training results: {total_train_rows} rows")
+    print(f"Total test results: {total_test_rows} rows")
+
     end_time = time.time()
     print(f"\nTotal execution time: {(end_time - start_time) / 60:.2f} minutes")
     
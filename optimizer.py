@@ -1,17 +1,32 @@
 # optimizer.py
 
 import itertools
+import math
+import multiprocessing
+import os
+import random
+import xxhash
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-import concurrent.futures
-from functools import partial
+from multiprocessing import shared_memory
+from joblib import Memory, Parallel, delayed
 
 from config import (
     PENALTY_FACTOR_GRID,
     MIN_HOLDING_PERIOD_GRID,
-    SHARPE_RATIO_WEIGHT_GRID
+    SHARPE_RATIO_WEIGHT_GRID,
+    SIGNAL_CACHE_DIR,
+    SEARCH_STRATEGY,
+    SEARCH_N_TRIALS
+)
+from backtest import (
+    FEE_FACTOR,
+    backtest_strategy_arr,
+    pct_change_arr,
+    _prepare_positions,
+    _calculate_performance_batch
 )
-from backtest import backtest_strategy
 from strategy import (
     moving_average_crossover,
     rsi,
@@ -34,44 +49,100 @@ STRATEGY_FUNCTIONS = {
     "zscore_mean_reversion": zscore_mean_reversion
 }
 
+# Disk layer of the signal cache: signals are pure functions of
+# (strategy, params, price data), so they memoize cleanly across runs.
+# The df itself is excluded from joblib's key (it would be slow to hash
+# and is already summarized by df_hash); compact int8 arrays are stored.
+_signal_memory = (
+    Memory(location=SIGNAL_CACHE_DIR, verbose=0)
+    if SIGNAL_CACHE_DIR else None
+)
+# Bound the on-disk size; evicts least-recently-used entries
+if _signal_memory is not None:
+    _signal_memory.reduce_size(bytes_limit=2**30)
+
+if _signal_memory is not None:
+    @_signal_memory.cache(ignore=["df"])
+    def _compute_signal(strategy_name, df_hash, frozen_params, df):
+        signal = STRATEGY_FUNCTIONS[strategy_name](df, **dict(frozen_params))
+        return signal.to_numpy(dtype=np.int8)
+else:
+    _compute_signal = None
+
 # Signal cache for avoiding redundant calculations
 class SignalCache:
-    """Cache for strategy signals to avoid repeated calculations"""
-    
+    """
+    Cache for strategy signals to avoid repeated calculations.
+
+    Keyed by (strategy_name, strat_params, df content hash) - meta-params
+    never enter the key, so every combination that differs only in
+    penalty/holding-period/Sharpe-weight reuses one computed signal, and
+    the content hash disambiguates train vs test frames of the same
+    symbol. LRU-bounded: hits refresh an entry, and at capacity the
+    least-recently-used entry is evicted (the old "clear half" scheme
+    threw away hot entries along with cold ones).
+    """
+
     def __init__(self, max_size=1000):
-        self.cache = {}
+        self.cache = OrderedDict()
         self.max_size = max_size
-    
+        self._df_hash_memo = {}
+
     def _get_hash(self, strategy_name, params, df_hash):
         """Create a hash from strategy name, parameters, and dataframe hash"""
         param_str = str(sorted(params.items()))
         combined = f"{strategy_name}_{param_str}_{df_hash}"
         return hash(combined)
-    
+
     def _get_df_hash(self, df):
-        """Create a hash of the dataframe's close price column"""
-        # We only hash the close prices since that's what most strategies use
-        close_prices = df["close_price"].values
-        return hash(tuple(close_prices))
+        """Content hash of the frame's close prices, computed once per frame"""
+        # We only hash the close prices since that's what most strategies
+        # use. The digest is memoized behind a cheap identity key
+        # (id + shape + last price), so the O(N) hash runs once per frame
+        # instead of once per .get() - but cache keys stay content-based,
+        # which keeps the disk layer valid across runs.
+        close_prices = df["close_price"].to_numpy()
+        ident = (id(df), close_prices.shape[0],
+                 close_prices[-1] if close_prices.shape[0] else 0.0)
+        df_hash = self._df_hash_memo.get(ident)
+        if df_hash is None:
+            df_hash = xxhash.xxh3_64_intdigest(close_prices.tobytes())
+            if len(self._df_hash_memo) >= 64:
+                self._df_hash_memo.pop(next(iter(self._df_hash_memo)))
+            self._df_hash_memo[ident] = df_hash
+        return df_hash
     
-    def get(self, strategy_name, df, **params):
-        """Get a signal from cache or compute it"""
-        df_hash = self._get_df_hash(df)
+    def get(self, strategy_name, df, _df_hash=None, **params):
+        """
+        Get a signal from cache or compute it. Callers sweeping one frame
+        can pass _df_hash (from _get_df_hash) to skip even the memo probe
+        per call.
+        """
+        df_hash = self._get_df_hash(df) if _df_hash is None else _df_hash
         cache_key = self._get_hash(strategy_name, params, df_hash)
-        
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-        
-        # Not in cache, compute the signal
-        signal = STRATEGY_FUNCTIONS[strategy_name](df, **params)
-        
-        # Store in cache
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.cache.move_to_end(cache_key)
+            return cached
+
+        # Not in memory: go through the disk layer when configured (hits
+        # from previous runs skip the strategy function entirely),
+        # otherwise compute directly
+        if _compute_signal is not None:
+            arr = _compute_signal(
+                strategy_name, df_hash, tuple(sorted(params.items())), df
+            )
+            signal = pd.Series(arr, index=df.index)
+        else:
+            # Strategies return int8 already; astype is a no-op guard
+            # that keeps the cache at one byte per bar
+            signal = STRATEGY_FUNCTIONS[strategy_name](df, **params).astype(np.int8, copy=False)
+
+        # Store in cache, evicting the least-recently-used entry at capacity
         if len(self.cache) >= self.max_size:
-            # Clear half the cache if it gets too big
-            keys_to_remove = list(self.cache.keys())[:self.max_size//2]
-            for key in keys_to_remove:
-                self.cache.pop(key)
-        
+            self.cache.popitem(last=False)
+
         self.cache[cache_key] = signal
         return signal
 
@@ -80,34 +151,80 @@ signal_cache = SignalCache()
 
 def generate_param_dicts(param_grid):
     """
-    Given a dictionary of lists, produce every combination.
-    E.g. {'a':[1,2],'b':[3]} => [{'a':1,'b':3},{'a':2,'b':3}]
+    Given a dictionary of lists, lazily yield every combination.
+    E.g. {'a':[1,2],'b':[3]} => {'a':1,'b':3}, {'a':2,'b':3}
+
+    A generator so enumeration is O(1) memory - callers that need the
+    whole product (sampling, repeated sweeps) wrap it in list(); sizing
+    checks use count_param_dicts instead of len().
     """
     if not param_grid:
-        return [{}]
+        yield {}
+        return
+    keys = list(param_grid.keys())
+    for vals in itertools.product(*param_grid.values()):
+        yield dict(zip(keys, vals))
+
+def count_param_dicts(param_grid):
+    """Number of combinations generate_param_dicts will yield"""
+    return math.prod(len(v) for v in param_grid.values()) if param_grid else 1
+
+def param_grid_columns(param_grid):
+    """
+    The full Cartesian product as flat per-axis ndarray columns (keys,
+    [col, ...]), row r being combination r in generate_param_dicts
+    order. Lets callers index arbitrary combinations without building a
+    dict per grid point; each column keeps its axis's native dtype so
+    values round-trip exactly via .item().
+    """
     keys = list(param_grid.keys())
-    values_product = list(itertools.product(*param_grid.values()))
-    return [dict(zip(keys, vals)) for vals in values_product]
+    grids = np.meshgrid(*[np.asarray(v) for v in param_grid.values()], indexing="ij")
+    return keys, [g.reshape(-1) for g in grids]
+
+# Contiguous float64 close prices per frame, extracted once instead of
+# per combo; identity-keyed like the df-hash memo in SignalCache
+_PRICES_MEMO_MAX = 64
+_prices_memo = {}
 
-def _evaluate_strategy_params(df, strategy_name, strat_params, meta_params, initial_capital, precomputed_returns):
+def _frame_prices(df):
+    """Cached contiguous float64 close-price array for a frame"""
+    closes = df["close_price"]
+    ident = (id(df), len(closes), closes.iloc[-1] if len(closes) else 0.0)
+    prices = _prices_memo.get(ident)
+    if prices is None:
+        prices = np.ascontiguousarray(closes.to_numpy(dtype=np.float64))
+        if len(_prices_memo) >= _PRICES_MEMO_MAX:
+            _prices_memo.pop(next(iter(_prices_memo)))
+        _prices_memo[ident] = prices
+    return prices
+
+def _evaluate_strategy_params(df, strategy_name, strat_params, meta_params, initial_capital, precomputed_returns, signal=None):
     """Helper function to evaluate a single set of strategy parameters"""
-    # Build signal using cache
-    signal = signal_cache.get(strategy_name, df, **strat_params)
-    
-    # Create minimal DataFrame for backtest
-    backtest_df = pd.DataFrame({"close_price": df["close_price"], "signal": signal})
-    
-    # Backtest
-    performance, final_portfolio, num_trades = backtest_strategy(
-        backtest_df,
+    # Build signal using cache unless the caller already fetched it (the
+    # grid loop passes it in so the cache key - a sort over the param
+    # items plus the df hash - is not rebuilt for every meta cell)
+    if signal is None:
+        signal = signal_cache.get(strategy_name, df, **strat_params)
+
+    # Backtest on raw arrays - no per-trial DataFrame is assembled just
+    # to carry a signal column (that copy used to dominate cheap strategies)
+    prices = _frame_prices(df)
+    signal_arr = np.ascontiguousarray(np.asarray(signal, dtype=np.int8))
+    performance, final_portfolio, num_trades = backtest_strategy_arr(
+        prices, signal_arr,
         initial_capital=initial_capital,
-        min_holding_period=meta_params["min_holding_period"],
-        precomputed_returns=precomputed_returns
+        min_holding_period=meta_params["min_holding_period"]
     )
-    
-    # Compute Sharpe ratio
-    strat_returns = signal.shift(1, fill_value=0) * precomputed_returns
-    std_dev = strat_returns.std()
+
+    # Compute Sharpe ratio (signal shifted one bar; ddof=1 matches the
+    # old pandas Series.std)
+    returns_arr = np.asarray(precomputed_returns, dtype=np.float64)
+    strat_returns = np.empty_like(returns_arr)
+    strat_returns[0] = 0.0
+    # out= writes the product straight into the buffer - no temporary
+    # array plus slice-copy per combo
+    np.multiply(signal_arr[:-1], returns_arr[1:], out=strat_returns[1:])
+    std_dev = strat_returns.std(ddof=1)
     sharpe_ratio = (strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
     
     # Compute final score
@@ -117,105 +234,379 @@ def _evaluate_strategy_params(df, strategy_name, strat_params, meta_params, init
     
     return score, performance, final_portfolio, num_trades, strat_params, meta_params
 
-def optimize_strategy(df, strategy_name, strategy_param_grid, initial_capital=10000, precomputed_returns=None):
+def _evaluate_param_set(df, strategy_name, strat_params, meta_param_dicts, initial_capital, precomputed_returns):
+    """
+    Evaluate one strategy param set over the whole meta grid, fetching its
+    signal once; returns the best (score, params, final_portfolio, trades).
+    Top-level so joblib can dispatch it to worker processes.
+    """
+    signal = signal_cache.get(strategy_name, df, **strat_params)
+
+    best = (float("-inf"), None, 0.0, 0)
+    for meta_params in meta_param_dicts:
+        score, performance, final_portfolio, num_trades, _, _ = _evaluate_strategy_params(
+            df, strategy_name, strat_params, meta_params, initial_capital, precomputed_returns,
+            signal=signal
+        )
+        if score > best[0]:
+            best = (score, {**strat_params, **meta_params}, final_portfolio, num_trades)
+    return best
+
+def _evaluate_param_grid_batch(df, strategy_name, strategy_param_dicts, meta_param_dicts,
+                               initial_capital, precomputed_returns):
+    """
+    Batch evaluation of a whole strategy grid: all param-set signals are
+    stacked into one (n_bars, n_sets) position matrix and backtested with
+    the prange batch kernel - once per distinct min_holding_period - so
+    the per-combination Python call overhead (signal fetch, kernel entry,
+    Sharpe pass) is paid once per param set instead of once per
+    (param set, meta cell). Scoring over the meta grid is a vectorized
+    (n_sets, n_meta) matrix with a flat argmax, which keeps the
+    param-major first-wins tie-breaking of the sequential scan.
+
+    Returns the same (score, params, final_portfolio, trades) tuple as
+    _evaluate_param_set's best.
+    """
+    strategy_param_dicts = list(strategy_param_dicts)
+    n_sets = len(strategy_param_dicts)
+    prices = _frame_prices(df)
+    returns_arr = np.asarray(precomputed_returns, dtype=np.float64)
+    n = prices.shape[0]
+
+    # Column-major so the batch kernel's per-column slices are contiguous
+    positions_2d = np.empty((n, n_sets), dtype=np.int8, order="F")
+    pos_change_2d = np.empty((n, n_sets), dtype=np.int8, order="F")
+    sharpes = np.empty(n_sets, dtype=np.float64)
+    strat_returns = np.empty(n, dtype=np.float64)
+    df_hash = signal_cache._get_df_hash(df)
+    for j, strat_params in enumerate(strategy_param_dicts):
+        sig = np.ascontiguousarray(np.asarray(
+            signal_cache.get(strategy_name, df, _df_hash=df_hash, **strat_params),
+            dtype=np.int8
+        ))
+        positions_2d[:, j], pos_change_2d[:, j] = _prepare_positions(sig)
+        # Sharpe depends only on the raw signal, never the meta cell;
+        # out= reuses the one scratch buffer across the whole grid
+        strat_returns[0] = 0.0
+        np.multiply(sig[:-1], returns_arr[1:], out=strat_returns[1:])
+        std_dev = strat_returns.std(ddof=1)
+        sharpes[j] = (strat_returns.mean() / std_dev) if std_dev > 0 else 0.0
+
+    # One batch backtest per distinct holding period; every meta cell
+    # sharing that period reuses its columns
+    perf_by_mhp = {
+        mhp: _calculate_performance_batch(
+            prices, positions_2d, pos_change_2d, initial_capital, FEE_FACTOR, mhp
+        )
+        for mhp in dict.fromkeys(m["min_holding_period"] for m in meta_param_dicts)
+    }
+
+    scores = np.empty((n_sets, len(meta_param_dicts)), dtype=np.float64)
+    for mi, meta_params in enumerate(meta_param_dicts):
+        perf, _, trades = perf_by_mhp[meta_params["min_holding_period"]]
+        w = meta_params["sharpe_ratio_weight"]
+        scores[:, mi] = (1 - w) * perf + w * sharpes - meta_params["penalty_factor"] * trades
+
+    flat = int(np.argmax(scores))
+    j, mi = divmod(flat, len(meta_param_dicts))
+    meta_params = meta_param_dicts[mi]
+    perf, final_values, trades = perf_by_mhp[meta_params["min_holding_period"]]
+    return (
+        scores.flat[flat],
+        {**strategy_param_dicts[j], **meta_params},
+        final_values[j],
+        int(trades[j])
+    )
+
+def _coarse_grid(param_grid):
+    """Every other value along each axis - stage 1 of refine mode"""
+    return {k: v[::2] for k, v in param_grid.items()}
+
+def _neighborhood_grid(param_grid, best_params):
+    """
+    The +-1-index neighborhood of best_params along each axis of the
+    full grid - stage 2 of refine mode. Falls back to the full axis if
+    the winning value is somehow absent from it.
+    """
+    refined = {}
+    for key, values in param_grid.items():
+        values = list(values)
+        if best_params is not None and best_params.get(key) in values:
+            i = values.index(best_params[key])
+            refined[key] = values[max(0, i - 1):i + 2]
+        else:
+            refined[key] = values
+    return refined
+
+def _optimize_strategy_bayes(optuna, df, strategy_name, strategy_param_grid, meta_param_dicts,
+                             initial_capital, precomputed_returns, n_trials):
+    """
+    Bayesian search over the strategy grid with optuna's TPE sampler.
+    Each trial picks one value per grid axis (suggest_categorical keeps
+    the search space identical to the grid) and is scored by the best
+    meta-param cell, same as the exhaustive path.
+    """
+    best = {"result": (float("-inf"), None, 0.0, 0)}
+
+    def objective(trial):
+        strat_params = {
+            key: trial.suggest_categorical(key, list(values))
+            for key, values in strategy_param_grid.items()
+        }
+        result = _evaluate_param_set(
+            df, strategy_name, strat_params, meta_param_dicts,
+            initial_capital, precomputed_returns
+        )
+        if result[0] > best["result"][0]:
+            best["result"] = result
+        return result[0]
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(
+        direction="maximize", sampler=optuna.samplers.TPESampler(seed=42)
+    )
+    study.optimize(objective, n_trials=n_trials)
+
+    best_score, best_overall_params, best_final_portfolio, best_num_trades = best["result"]
+    return best_overall_params, best_score, best_final_portfolio, best_num_trades
+
+def optimize_strategy(df, strategy_name, strategy_param_grid, initial_capital=10000,
+                      precomputed_returns=None, n_jobs=1,
+                      search=SEARCH_STRATEGY, n_trials=SEARCH_N_TRIALS,
+                      refine=False):
     """
     Optimized version of strategy optimization using parallelization
-    and caching for better performance.
+    and caching for better performance. Each strategy param set is an
+    independent grid slice, so with n_jobs != 1 they are fanned out across
+    cores via joblib's loky backend (n_jobs=1 keeps the sequential path,
+    the safe default when the caller is already parallel).
+
+    search="grid" sweeps the whole grid; "random" evaluates a seeded
+    sample of n_trials param sets; "bayes" runs optuna's TPE sampler
+    over the grid values for n_trials trials (falls back to "random"
+    when optuna is not installed). Meta-params are always swept in full.
+
+    refine=True replaces the exhaustive grid sweep with a coarse-to-fine
+    pass: every other value along each axis first, then the +-1-index
+    neighborhood of the coarse winner on the full grid. Roughly
+    (L/2)^k + 3^k evaluations instead of L^k for k axes of L values.
     """
     # Ensure we have precomputed returns
     if precomputed_returns is None:
-        precomputed_returns = df["close_price"].pct_change().fillna(0)
-    
-    # Generate parameter combinations
+        precomputed_returns = pct_change_arr(df["close_price"].to_numpy(dtype=np.float64))
+
+    if refine and search == "grid":
+        coarse = optimize_strategy(
+            df, strategy_name, _coarse_grid(strategy_param_grid), initial_capital,
+            precomputed_returns, n_jobs
+        )
+        fine = optimize_strategy(
+            df, strategy_name, _neighborhood_grid(strategy_param_grid, coarse[0]),
+            initial_capital, precomputed_returns, n_jobs
+        )
+        return fine if fine[1] > coarse[1] else coarse
+
+    # Strategy param sets stream from the generator (never materialized
+    # for a plain grid sweep); the small meta grid is reused per set, so
+    # it is listed once
+    n_param_sets = count_param_dicts(strategy_param_grid)
     strategy_param_dicts = generate_param_dicts(strategy_param_grid)
-    meta_param_dicts = generate_param_dicts({
+    meta_param_dicts = list(generate_param_dicts({
         "penalty_factor": PENALTY_FACTOR_GRID,
         "min_holding_period": MIN_HOLDING_PERIOD_GRID,
         "sharpe_ratio_weight": SHARPE_RATIO_WEIGHT_GRID
-    })
-    
-    best_overall_params = None
-    best_score = float("-inf")
-    best_final_portfolio = 0.0
-    best_num_trades = 0
-    
-    # Create parameter combinations
-    param_combinations = []
-    for strat_params in strategy_param_dicts:
-        for meta_params in meta_param_dicts:
-            param_combinations.append((strat_params, meta_params))
-    
-    # Evaluate parameters in batches to control memory usage
-    batch_size = 100  # Adjust based on your system's memory
-    for i in range(0, len(param_combinations), batch_size):
-        batch = param_combinations[i:i + batch_size]
-        
-        # Process batch
-        for strat_params, meta_params in batch:
-            score, performance, final_portfolio, num_trades, _, _ = _evaluate_strategy_params(
-                df, strategy_name, strat_params, meta_params, initial_capital, precomputed_returns
+    }))
+
+    if search == "bayes":
+        try:
+            import optuna
+        except ImportError:
+            print("optuna not installed; falling back to random search")
+            search = "random"
+        else:
+            return _optimize_strategy_bayes(
+                optuna, df, strategy_name, strategy_param_grid, meta_param_dicts,
+                initial_capital, precomputed_returns, n_trials
             )
-            
-            if score > best_score:
-                best_score = score
-                best_overall_params = {**strat_params, **meta_params}
-                best_final_portfolio = final_portfolio
-                best_num_trades = num_trades
-    
+
+    if search == "random" and n_trials < n_param_sets:
+        # Seeded so repeated runs search the same subset. Sampling row
+        # indices against the meshgrid columns picks the same combos as
+        # sampling a materialized dict list, without building a dict per
+        # unsampled grid point
+        rng = random.Random(42)
+        keys, cols = param_grid_columns(strategy_param_grid)
+        strategy_param_dicts = [
+            {key: cols[i][r].item() for i, key in enumerate(keys)}
+            for r in rng.sample(range(n_param_sets), n_trials)
+        ]
+
+    if n_jobs == 1 or n_param_sets <= 1:
+        # Single-process: evaluate the whole grid as one stacked batch
+        best_score, best_overall_params, best_final_portfolio, best_num_trades = \
+            _evaluate_param_grid_batch(
+                df, strategy_name, strategy_param_dicts, meta_param_dicts,
+                initial_capital, precomputed_returns
+            )
+    else:
+        results = Parallel(n_jobs=n_jobs, backend="loky", batch_size="auto")(
+            delayed(_evaluate_param_set)(
+                df, strategy_name, strat_params, meta_param_dicts,
+                initial_capital, precomputed_returns
+            )
+            for strat_params in strategy_param_dicts
+        )
+
+        # max keeps the earliest entry on ties, matching the sequential scan
+        best_score, best_overall_params, best_final_portfolio, best_num_trades = max(
+            results, key=lambda r: r[0]
+        )
+
     return best_overall_params, best_score, best_final_portfolio, best_num_trades
 
-def optimize_strategy_parallel(df, strategy_name, strategy_param_grid, initial_capital=10000, 
+def _warmup_kernels():
+    """
+    Touch every JIT kernel once on tiny inputs so a fresh worker process
+    loads the compiled artifacts from the shared numba cache up front,
+    instead of paying the compile/load latency inside its first real
+    backtest.
+    """
+    import strategy as _strategy
+    from combo_signals import combine_signals as _combine
+
+    prices = np.arange(64, dtype=np.float64) + 1.0
+    signal = np.ones(64, dtype=np.int8)
+    backtest_strategy_arr(prices, signal, 1000.0, 0)
+    backtest_strategy_arr(prices, signal, 1000.0, 2)
+    _strategy._masks_to_position(np.zeros(8, dtype=bool), np.zeros(8, dtype=bool))
+    _strategy._ma_crossover_signal(prices, 2, 4)
+    _strategy._bollinger_signal(prices, 4, 2.0)
+    _strategy._macd_signal(prices, 0.2, 0.1, 0.3)
+    _strategy._zscore_signal(prices, 4, 2.0)
+    _combine(np.zeros((8, 2), dtype=np.int8))
+
+# Columns shipped to workers through shared memory, in matrix order
+_SHARED_FRAME_COLUMNS = ("open_price", "high_price", "low_price",
+                         "close_price", "volume_crypto")
+
+# Per-worker view of the shared frame, set by the pool initializer
+_worker_shm = None
+_worker_df = None
+_worker_returns = None
+_worker_strategy_name = None
+_worker_initial_capital = None
+
+def _init_worker_shared_frame(shm_name, n_rows, strategy_name, initial_capital):
+    """
+    Pool initializer: attach to the parent's shared-memory block and
+    rebuild the price frame as zero-copy column views over it, so tasks
+    carry only param dicts instead of each pickling the full DataFrame
+    across the pipe. The fixed per-run arguments (strategy name, capital)
+    ride along here for the same reason. Also pre-loads the JIT kernels.
+    """
+    global _worker_shm, _worker_df, _worker_returns
+    global _worker_strategy_name, _worker_initial_capital
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    mat = np.ndarray((n_rows, len(_SHARED_FRAME_COLUMNS)),
+                     dtype=np.float64, buffer=_worker_shm.buf, order="F")
+    _worker_df = pd.DataFrame(
+        {col: mat[:, i] for i, col in enumerate(_SHARED_FRAME_COLUMNS)},
+        copy=False
+    )
+    # Returns are a pure function of close, so each worker derives them
+    # once here instead of them riding through the task pipe
+    close = mat[:, _SHARED_FRAME_COLUMNS.index("close_price")]
+    _worker_returns = np.empty(n_rows, dtype=np.float64)
+    if n_rows:
+        _worker_returns[0] = 0.0
+        _worker_returns[1:] = close[1:] / close[:-1] - 1.0
+    _worker_strategy_name = strategy_name
+    _worker_initial_capital = initial_capital
+    _warmup_kernels()
+
+def _evaluate_shared_combo(combo):
+    """
+    Task body for optimize_strategy_parallel: one (strat_params,
+    meta_params) tuple against the shared frame. Errors are returned as
+    None so a bad combo is skipped without poisoning its whole chunk.
+    """
+    strat_params, meta_params = combo
+    try:
+        return _evaluate_strategy_params(
+            _worker_df, _worker_strategy_name, strat_params, meta_params,
+            _worker_initial_capital, _worker_returns
+        )
+    except Exception as e:
+        print(f"Error optimizing strategy {_worker_strategy_name}: {e}")
+        return None
+
+def optimize_strategy_parallel(df, strategy_name, strategy_param_grid, initial_capital=10000,
                               precomputed_returns=None, max_workers=None):
     """
-    Parallel version of strategy optimization for better performance on multi-core systems.
+    Parallel version of strategy optimization for better performance on
+    multi-core systems. The price columns and precomputed returns are
+    placed in a multiprocessing shared-memory block that every worker
+    maps once at startup, so the per-task payload is just the two param
+    dicts rather than a pickled copy of the frame. Combos are streamed
+    through imap_unordered in chunks, which amortizes dispatch/pickling
+    over a batch instead of paying one future per parameter tuple.
+
+    precomputed_returns is accepted for signature compatibility but not
+    shipped anywhere: returns are a pure function of close, so each
+    worker derives them once from the shared close column at startup.
     """
-    # Ensure we have precomputed returns
-    if precomputed_returns is None:
-        precomputed_returns = df["close_price"].pct_change().fillna(0)
-    
-    # Generate parameter combinations
+    # Generate parameter combinations (the meta grid is re-swept per
+    # strategy set, so it must be a list)
     strategy_param_dicts = generate_param_dicts(strategy_param_grid)
-    meta_param_dicts = generate_param_dicts({
+    meta_param_dicts = list(generate_param_dicts({
         "penalty_factor": PENALTY_FACTOR_GRID,
         "min_holding_period": MIN_HOLDING_PERIOD_GRID,
         "sharpe_ratio_weight": SHARPE_RATIO_WEIGHT_GRID
-    })
-    
+    }))
+
     # Create parameter combinations
     param_combinations = []
     for strat_params in strategy_param_dicts:
         for meta_params in meta_param_dicts:
             param_combinations.append((strat_params, meta_params))
-    
-    # Create partial function with fixed parameters
-    evaluate_func = partial(
-        _evaluate_strategy_params,
-        df=df,
-        strategy_name=strategy_name,
-        initial_capital=initial_capital,
-        precomputed_returns=precomputed_returns
-    )
-    
-    # Process in parallel
-    results = []
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(evaluate_func, strat_params, meta_params)
-            for strat_params, meta_params in param_combinations
-        ]
-        
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                results.append(future.result())
-            except Exception as e:
-                print(f"Error optimizing strategy {strategy_name}: {e}")
-    
+
+    # Stage the frame in shared memory: one float64 matrix, column-major
+    # so each worker's per-column views are contiguous
+    n_rows = len(df)
+    n_cols = len(_SHARED_FRAME_COLUMNS)
+    n_workers = max_workers or (os.cpu_count() or 1)
+    # ~8 chunks per worker balances amortized dispatch against stragglers
+    chunksize = max(1, len(param_combinations) // (8 * n_workers))
+    shm = shared_memory.SharedMemory(create=True, size=max(8 * n_rows * n_cols, 1))
+    best_result = None
+    try:
+        mat = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=shm.buf, order="F")
+        for i, col in enumerate(_SHARED_FRAME_COLUMNS):
+            mat[:, i] = df[col].to_numpy(dtype=np.float64)
+
+        # Process in parallel; keep only the running best rather than
+        # accumulating every combo's result
+        with multiprocessing.Pool(
+            processes=max_workers,
+            initializer=_init_worker_shared_frame,
+            initargs=(shm.name, n_rows, strategy_name, initial_capital)
+        ) as pool:
+            for result in pool.imap_unordered(
+                _evaluate_shared_combo, param_combinations, chunksize=chunksize
+            ):
+                if result is None:
+                    continue
+                if best_result is None or result[0] > best_result[0]:
+                    best_result = result
+    finally:
+        shm.close()
+        shm.unlink()
+
     # Find best result
-    if results:
-        best_result = max(results, key=lambda x: x[0])  # Sort by score
+    if best_result is not None:
         best_score, _, best_final_portfolio, best_num_trades, best_strat_params, best_meta_params = best_result
         best_overall_params = {**best_strat_params, **best_meta_params}
         return best_overall_params, best_score, best_final_portfolio, best_num_trades
-    
+
     # Fallback to empty results
     return {}, 0.0, initial_capital, 0
\ No newline at end of file
@@ -1,156 +1,483 @@
 # strategy.py
 
+from typing import NamedTuple, Optional
+
 import numpy as np
 import pandas as pd
 
-def moving_average_crossover(df: pd.DataFrame, short_window: int, long_window: int):
+import config  # noqa: F401  (sets NUMBA_CACHE_DIR before numba loads)
+import numba
+
+class PriceData(NamedTuple):
     """
-    Strategy: Buy if short MA crosses above long MA, sell if short MA crosses below long MA.
-    Returns just the 'signal' Series.
+    SoA view of a price frame: one contiguous numpy array per column,
+    extracted once and shared by every strategy call on the same frame.
+    Strategies read these instead of paying a pandas __getitem__ per
+    column access per trial.
+
+    Columns are float32: signals only need sign comparisons, and halving
+    the bandwidth matters on these memory-bound kernels. Kernels that
+    accumulate (running sums, EMA states) carry float64 accumulators, so
+    only the per-element loads are narrow.
     """
-    ma_short = df["close_price"].rolling(window=short_window).mean()
-    ma_long = df["close_price"].rolling(window=long_window).mean()
+    open: Optional[np.ndarray]
+    high: Optional[np.ndarray]
+    low: Optional[np.ndarray]
+    close: np.ndarray
+    vol_crypto: Optional[np.ndarray]
+    vol_usd: Optional[np.ndarray]
+    index: Optional[pd.Index]
+
+    @classmethod
+    def from_df(cls, df):
+        """
+        Build (or pass through) the array view of a price DataFrame.
+        Only close_price is mandatory: callers may project a frame down
+        to each strategy's REQUIRED_COLS, so absent columns become None.
+        """
+        if isinstance(df, cls):
+            return df
+        cached = _price_data_cache.get(_frame_key(df))
+        if cached is not None:
+            return cached
+
+        def col(name):
+            return (df[name].to_numpy(dtype=np.float32)
+                    if name in df.columns else None)
 
-    # 1 = long, -1 = short
-    signal = np.where(ma_short > ma_long, 1, -1)
+        data = cls(
+            open=col("open_price"),
+            high=col("high_price"),
+            low=col("low_price"),
+            close=df["close_price"].to_numpy(dtype=np.float32),
+            vol_crypto=col("volume_crypto"),
+            vol_usd=col("volume_usd"),
+            index=df.index,
+        )
+        if len(_price_data_cache) >= _PRICE_DATA_CACHE_MAX:
+            _price_data_cache.pop(next(iter(_price_data_cache)))
+        _price_data_cache[_frame_key(df)] = data
+        return data
 
-    # Forward-fill any zeros
-    signal_series = pd.Series(signal, index=df.index)
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+def _frame_key(df):
+    """Identity key for a frame; shape + last close disambiguate reused ids"""
+    return (id(df), len(df), df["close_price"].iloc[-1] if len(df) else 0.0)
 
-def rsi(df: pd.DataFrame, period: int, buy_threshold: float, sell_threshold: float):
+_PRICE_DATA_CACHE_MAX = 64
+_price_data_cache = {}
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _masks_to_position(buy_mask, sell_mask):
     """
-    Strategy: Buy when RSI < buy_threshold, Sell when RSI > sell_threshold, else hold.
+    Fused signal build: emit +1/-1 from the boolean buy/sell masks and
+    carry the forward-fill state in the same scan, replacing the old
+    mask-assign + mask(==0) + ffill + fillna pandas chain (four N-length
+    temporaries) with one int8 output pass. Sell wins when both masks
+    fire on a bar, matching the old write order.
     """
-    delta = df["close_price"].diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
+    n = buy_mask.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    prev = np.int8(0)
+    for i in range(n):
+        if sell_mask[i]:
+            prev = np.int8(-1)
+        elif buy_mask[i]:
+            prev = np.int8(1)
+        out[i] = prev
+    return out
 
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / (avg_loss + 1e-10)
-    rsi_vals = 100 - (100 / (1 + rs))
+def _finalize(buy_mask, sell_mask, data: PriceData):
+    """
+    int8 signal Series on the frame's index from buy/sell masks, with
+    zeros forward-filled to hold positions (same contract every strategy
+    has always returned).
+    """
+    raw = _masks_to_position(
+        np.ascontiguousarray(buy_mask), np.ascontiguousarray(sell_mask)
+    )
+    return pd.Series(raw, index=data.index)
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[rsi_vals < buy_threshold] = 1
-    signal_series[rsi_vals > sell_threshold] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _ma_crossover_signal(close, short_window, long_window):
+    """
+    Fused MA-crossover kernel: both moving averages are carried as
+    running window sums (add new bar, drop old) and the comparison is
+    emitted in the same sweep, replacing two rolling-mean passes plus a
+    mask/ffill chain with one loop and one int8 output. Bars before the
+    long window fills compare False, i.e. short - same as the NaN head
+    of the rolling version.
+    """
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    s_short = 0.0
+    s_long = 0.0
+    for i in range(n):
+        x = close[i]
+        s_short += x
+        if i >= short_window:
+            s_short -= close[i - short_window]
+        s_long += x
+        if i >= long_window:
+            s_long -= close[i - long_window]
+        buy = False
+        if i >= short_window - 1 and i >= long_window - 1:
+            buy = s_short / short_window > s_long / long_window
+        out[i] = np.int8(1) if buy else np.int8(-1)
+    return out
 
-def bollinger_bands(df: pd.DataFrame, period: int, std_dev: float = 2.0):
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _bollinger_signal(close, period, std_dev):
     """
-    Strategy: Buy if price crosses below lower band, Sell if price crosses above upper band.
+    Fused Bollinger kernel: running sum and sum-of-squares give the
+    window mean and sample std (ddof=1) per bar, and the band comparison
+    plus position forward-fill happen in the same sweep. Sell (upper
+    band) keeps precedence, matching the mask write order.
     """
-    middle_band = df["close_price"].rolling(window=period).mean()
-    rolling_std = df["close_price"].rolling(window=period).std()
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    s = 0.0
+    s2 = 0.0
+    prev = np.int8(0)
+    for i in range(n):
+        x = close[i]
+        s += x
+        s2 += x * x
+        if i >= period:
+            old = close[i - period]
+            s -= old
+            s2 -= old * old
+        if i >= period - 1:
+            mean = s / period
+            var = (s2 - s * s / period) / (period - 1)
+            if var < 0.0:
+                var = 0.0
+            band = std_dev * np.sqrt(var)
+            if x > mean + band:
+                prev = np.int8(-1)
+            elif x < mean - band:
+                prev = np.int8(1)
+        out[i] = prev
+    return out
 
-    upper_band = middle_band + std_dev * rolling_std
-    lower_band = middle_band - std_dev * rolling_std
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _macd_signal(close, alpha_fast, alpha_slow, alpha_sig):
+    """
+    Fused MACD kernel: the fast EMA, slow EMA and signal-line EMA are
+    all simple y = a*x + (1-a)*y recurrences (pandas ewm adjust=False),
+    so one scalar loop carries all three states and emits the int8
+    signal directly, replacing three ewm passes and their full-length
+    intermediates. Equal lines hold the previous position, matching the
+    mask semantics of the vectorized version.
+    """
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    ef = close[0] if n else 0.0
+    es = ef
+    msig = 0.0
+    prev = np.int8(0)
+    for i in range(n):
+        x = close[i]
+        ef = alpha_fast * x + (1.0 - alpha_fast) * ef
+        es = alpha_slow * x + (1.0 - alpha_slow) * es
+        ml = ef - es
+        if i == 0:
+            msig = ml
+        else:
+            msig = alpha_sig * ml + (1.0 - alpha_sig) * msig
+        if ml > msig:
+            prev = np.int8(1)
+        elif ml < msig:
+            prev = np.int8(-1)
+        out[i] = prev
+    return out
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[df["close_price"] < lower_band] = 1
-    signal_series[df["close_price"] > upper_band] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _zscore_signal(close, window, threshold):
+    """
+    Fused z-score kernel: same running sum / sum-of-squares scheme as
+    _bollinger_signal, with the +-threshold comparison and forward-fill
+    emitted in the sweep (epsilon in the denominator matches the
+    vectorized version's guard against a zero std).
+    """
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    s = 0.0
+    s2 = 0.0
+    prev = np.int8(0)
+    for i in range(n):
+        x = close[i]
+        s += x
+        s2 += x * x
+        if i >= window:
+            old = close[i - window]
+            s -= old
+            s2 -= old * old
+        if i >= window - 1:
+            mean = s / window
+            var = (s2 - s * s / window) / (window - 1)
+            if var < 0.0:
+                var = 0.0
+            z = (x - mean) / (np.sqrt(var) + 1e-10)
+            if z > threshold:
+                prev = np.int8(-1)
+            elif z < -threshold:
+                prev = np.int8(1)
+        out[i] = prev
+    return out
 
-def macd(df: pd.DataFrame, fast_period: int, slow_period: int, signal_period: int):
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _breakout_signal(close, lookback):
     """
-    Strategy: Buy if MACD > MACD signal line, Sell if MACD < MACD signal line.
+    Fused breakout kernel: rolling max/min over the previous lookback
+    bars via two monotonic deques (index ring buffers), O(N) total
+    instead of pandas' O(N*W) rolling aggregation, with the comparison
+    and position forward-fill emitted in the same scan. Bars before the
+    window fills hold the previous position, matching the NaN head of
+    the rolling version.
     """
-    ema_fast = df["close_price"].ewm(span=fast_period, adjust=False).mean()
-    ema_slow = df["close_price"].ewm(span=slow_period, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    macd_signal = macd_line.ewm(span=signal_period, adjust=False).mean()
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    max_idx = np.empty(n, dtype=np.int64)
+    min_idx = np.empty(n, dtype=np.int64)
+    max_head = max_tail = 0
+    min_head = min_tail = 0
+    prev = np.int8(0)
+    for i in range(n):
+        # Drop candidates that fell out of the window [i-lookback, i-1]
+        while max_head < max_tail and max_idx[max_head] < i - lookback:
+            max_head += 1
+        while min_head < min_tail and min_idx[min_head] < i - lookback:
+            min_head += 1
+
+        if i >= lookback:
+            if close[i] > close[max_idx[max_head]]:
+                prev = np.int8(1)
+            elif close[i] < close[min_idx[min_head]]:
+                prev = np.int8(-1)
+        out[i] = prev
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[macd_line > macd_signal] = 1
-    signal_series[macd_line < macd_signal] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+        # Admit bar i for future windows, evicting dominated candidates
+        while max_tail > max_head and close[max_idx[max_tail - 1]] <= close[i]:
+            max_tail -= 1
+        max_idx[max_tail] = i
+        max_tail += 1
+        while min_tail > min_head and close[min_idx[min_tail - 1]] >= close[i]:
+            min_tail -= 1
+        min_idx[min_tail] = i
+        min_tail += 1
+    return out
 
-def high_low_breakout(df: pd.DataFrame, lookback: int):
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _rsi_values_kernel(close, period):
     """
-    Strategy: Buy if current price breaks above max of last 'lookback' bars,
-              Sell if current price breaks below min of last 'lookback' bars.
+    Single-pass RSI: the close-to-close delta is computed on the fly and
+    the window averages of gains and losses are carried as running sums
+    over a circular buffer (add new bar, drop the one leaving the
+    window), so no gain/loss/rolling-mean intermediates are allocated.
+    Bars before the window fills are NaN, same as the rolling version.
     """
-    rolling_high = df["close_price"].rolling(window=lookback).max()
-    rolling_low = df["close_price"].rolling(window=lookback).min()
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    gain_buf = np.zeros(period, dtype=np.float64)
+    loss_buf = np.zeros(period, dtype=np.float64)
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(n):
+        gain = 0.0
+        loss = 0.0
+        if i > 0:
+            delta = np.float64(close[i]) - np.float64(close[i - 1])
+            if delta > 0.0:
+                gain = delta
+            elif delta < 0.0:
+                loss = -delta
+        j = i % period
+        gain_sum += gain - gain_buf[j]
+        gain_buf[j] = gain
+        loss_sum += loss - loss_buf[j]
+        loss_buf[j] = loss
+        if i >= period - 1:
+            rs = (gain_sum / period) / (loss_sum / period + 1e-10)
+            out[i] = 100.0 - 100.0 / (1.0 + rs)
+        else:
+            out[i] = np.nan
+    return out
+
+# RSI values per (frame, period): rsi and vwap_zone share the exact same
+# computation, and every grid point with the same period reuses it
+_RSI_CACHE_MAX = 64
+_rsi_cache = {}
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[df["close_price"] > rolling_high.shift(1)] = 1
-    signal_series[df["close_price"] < rolling_low.shift(1)] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+def _rsi_values(data: PriceData, period: int):
+    """Cached RSI over close; shared by the rsi and vwap_zone strategies"""
+    key = (id(data.close), data.close.shape[0], period)
+    cached = _rsi_cache.get(key)
+    if cached is not None:
+        return cached[1]
+    rsi_vals = _rsi_values_kernel(np.ascontiguousarray(data.close), period)
+    if len(_rsi_cache) >= _RSI_CACHE_MAX:
+        _rsi_cache.pop(next(iter(_rsi_cache)))
+    # The close array is stored alongside the result to pin it alive:
+    # the key is identity-based, and without the pin a freed close
+    # array's id could be recycled by a same-length frame and serve its
+    # RSI for different prices
+    _rsi_cache[key] = (data.close, rsi_vals)
+    return rsi_vals
 
-def volume_price_action(df: pd.DataFrame, volume_multiplier: float):
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _volume_price_action_signal(close, open_, vol, window, volume_multiplier):
     """
-    Strategy: If large volume spike + bullish engulfing => Buy,
-              If large volume spike + bearish engulfing => Sell.
+    Fused volume/price-action kernel: the volume moving average runs as
+    a window sum (float64 accumulator, rounded to float32 per bar to
+    match the rolling mean it replaces), and the engulfing-pattern and
+    spike conditions are evaluated per bar with the forward-fill carried
+    in the same scan - no boolean mask intermediates. Bearish engulfing
+    keeps precedence over bullish, matching the mask write order.
+    """
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    vol_sum = 0.0
+    mult = np.float32(volume_multiplier)
+    prev = np.int8(0)
+    for i in range(n):
+        vol_sum += np.float64(vol[i])
+        if i >= window:
+            vol_sum -= np.float64(vol[i - window])
+        if i > 0 and i >= window - 1:
+            spike = vol[i] > np.float32(vol_sum / window) * mult
+            if spike:
+                if close[i] < close[i - 1] and open_[i] > open_[i - 1]:
+                    prev = np.int8(-1)
+                elif close[i] > close[i - 1] and open_[i] < open_[i - 1]:
+                    prev = np.int8(1)
+        out[i] = prev
+    return out
+
+@numba.jit(nopython=True, nogil=True, cache=True)
+def _vwap_zone_signal(close, vol, rsi_vals, rsi_lower, rsi_upper):
+    """
+    Fused VWAP-zone kernel: the two cumulative sums behind VWAP collapse
+    into a pair of running accumulators, and the zone comparison plus
+    forward-fill are emitted in the same sweep (NaN RSI bars compare
+    False and hold, matching the vectorized head). Accumulation stays
+    float32 to match the cumsum arithmetic it replaces.
     """
-    volume_ma = df["volume_crypto"].rolling(window=20).mean()
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.int8)
+    cum_price_vol = np.float32(0.0)
+    cum_vol = np.float32(0.0)
+    eps = np.float32(1e-10)
+    prev = np.int8(0)
+    for i in range(n):
+        c = close[i]
+        v = vol[i]
+        cum_price_vol += c * v
+        cum_vol += v
+        vwap = cum_price_vol / (cum_vol + eps)
+        r = rsi_vals[i]
+        if c > vwap and r < rsi_upper:
+            prev = np.int8(-1)
+        elif c < vwap and r > rsi_lower:
+            prev = np.int8(1)
+        out[i] = prev
+    return out
 
-    prev_close = df["close_price"].shift(1)
-    prev_open = df["open_price"].shift(1)
+def moving_average_crossover(df, short_window: int, long_window: int):
+    """
+    Strategy: Buy if short MA crosses above long MA, sell if short MA crosses below long MA.
+    Returns just the 'signal' Series.
+    """
+    data = PriceData.from_df(df)
+    raw = _ma_crossover_signal(
+        np.ascontiguousarray(data.close), short_window, long_window
+    )
+    return pd.Series(raw, index=data.index)
 
-    bullish_engulf = (df["close_price"] > prev_close) & (df["open_price"] < prev_open)
-    bearish_engulf = (df["close_price"] < prev_close) & (df["open_price"] > prev_open)
+def rsi(df, period: int, buy_threshold: float, sell_threshold: float):
+    """
+    Strategy: Buy when RSI < buy_threshold, Sell when RSI > sell_threshold, else hold.
+    """
+    data = PriceData.from_df(df)
+    rsi_vals = _rsi_values(data, period)
 
-    volume_spike = df["volume_crypto"] > (volume_ma * volume_multiplier)
+    return _finalize(rsi_vals < buy_threshold, rsi_vals > sell_threshold, data)
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[bullish_engulf & volume_spike] = 1
-    signal_series[bearish_engulf & volume_spike] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+def bollinger_bands(df, period: int, std_dev: float = 2.0):
+    """
+    Strategy: Buy if price crosses below lower band, Sell if price crosses above upper band.
+    """
+    data = PriceData.from_df(df)
+    raw = _bollinger_signal(
+        np.ascontiguousarray(data.close), period, float(std_dev)
+    )
+    return pd.Series(raw, index=data.index)
 
-def vwap_zone(df: pd.DataFrame, rsi_period: int, rsi_lower: float, rsi_upper: float):
+def macd(df, fast_period: int, slow_period: int, signal_period: int):
     """
-    Strategy: 
-      - Calculate VWAP 
-      - Buy if price < VWAP and RSI > rsi_lower
-      - Sell if price > VWAP and RSI < rsi_upper
+    Strategy: Buy if MACD > MACD signal line, Sell if MACD < MACD signal line.
+    """
+    data = PriceData.from_df(df)
+    raw = _macd_signal(
+        np.ascontiguousarray(data.close),
+        2.0 / (fast_period + 1), 2.0 / (slow_period + 1), 2.0 / (signal_period + 1)
+    )
+    return pd.Series(raw, index=data.index)
+
+def high_low_breakout(df, lookback: int):
+    """
+    Strategy: Buy if current price breaks above max of last 'lookback' bars,
+              Sell if current price breaks below min of last 'lookback' bars.
     """
-    cum_price_vol = (df["close_price"] * df["volume_crypto"]).cumsum()
-    cum_vol = df["volume_crypto"].cumsum()
-    vwap_vals = cum_price_vol / (cum_vol + 1e-10)
+    data = PriceData.from_df(df)
+    raw = _breakout_signal(np.ascontiguousarray(data.close), lookback)
+    return pd.Series(raw, index=data.index)
 
-    # RSI
-    delta = df["close_price"].diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=rsi_period).mean()
-    avg_loss = loss.rolling(window=rsi_period).mean()
-    rs = avg_gain / (avg_loss + 1e-10)
-    rsi_vals = 100 - (100 / (1 + rs))
+def volume_price_action(df, volume_multiplier: float):
+    """
+    Strategy: If large volume spike + bullish engulfing => Buy,
+              If large volume spike + bearish engulfing => Sell.
+    """
+    data = PriceData.from_df(df)
+    raw = _volume_price_action_signal(
+        np.ascontiguousarray(data.close), np.ascontiguousarray(data.open),
+        np.ascontiguousarray(data.vol_crypto), 20, float(volume_multiplier)
+    )
+    return pd.Series(raw, index=data.index)
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[(df["close_price"] < vwap_vals) & (rsi_vals > rsi_lower)] = 1
-    signal_series[(df["close_price"] > vwap_vals) & (rsi_vals < rsi_upper)] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
+def vwap_zone(df, rsi_period: int, rsi_lower: float, rsi_upper: float):
+    """
+    Strategy:
+      - Calculate VWAP
+      - Buy if price < VWAP and RSI > rsi_lower
+      - Sell if price > VWAP and RSI < rsi_upper
+    """
+    data = PriceData.from_df(df)
+    raw = _vwap_zone_signal(
+        np.ascontiguousarray(data.close), np.ascontiguousarray(data.vol_crypto),
+        _rsi_values(data, rsi_period), float(rsi_lower), float(rsi_upper)
+    )
+    return pd.Series(raw, index=data.index)
 
-def zscore_mean_reversion(df: pd.DataFrame, zscore_window: int, zscore_threshold: float):
+def zscore_mean_reversion(df, zscore_window: int, zscore_threshold: float):
     """
     Strategy:
       - If z-score < -zscore_threshold => buy
       - If z-score >  zscore_threshold => sell
     """
-    rolling_mean = df["close_price"].rolling(window=zscore_window).mean()
-    rolling_std = df["close_price"].rolling(window=zscore_window).std()
-
-    zscore_vals = (df["close_price"] - rolling_mean) / (rolling_std + 1e-10)
+    data = PriceData.from_df(df)
+    raw = _zscore_signal(
+        np.ascontiguousarray(data.close), zscore_window, float(zscore_threshold)
+    )
+    return pd.Series(raw, index=data.index)
 
-    signal_series = pd.Series(0, index=df.index)
-    signal_series[zscore_vals < -zscore_threshold] = 1
-    signal_series[zscore_vals >  zscore_threshold] = -1
-    # Updated method to avoid deprecated replace() with method parameter
-    signal_series = signal_series.mask(signal_series == 0).ffill().fillna(0)
-    return signal_series
\ No newline at end of file
+# Column manifest per strategy: callers (e.g. tester.test_combo) project
+# a fetched frame down to the union of these before fanning out, so the
+# backtest scan never drags unused OHLCV columns through the caches.
+moving_average_crossover.REQUIRED_COLS = frozenset({"close_price"})
+rsi.REQUIRED_COLS = frozenset({"close_price"})
+bollinger_bands.REQUIRED_COLS = frozenset({"close_price"})
+macd.REQUIRED_COLS = frozenset({"close_price"})
+high_low_breakout.REQUIRED_COLS = frozenset({"close_price"})
+volume_price_action.REQUIRED_COLS = frozenset({"close_price", "open_price", "volume_crypto"})
+vwap_zone.REQUIRED_COLS = frozenset({"close_price", "volume_crypto"})
+zscore_mean_reversion.REQUIRED_COLS = frozenset({"close_price"})
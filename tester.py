@@ -1,13 +1,39 @@
 # tester.py
 
-import ast  # for safely parsing dict/list strings from input
+import ast  # fallback parser for Python-literal (single-quote) input
+import cmd
+import concurrent.futures
+import json
+import os
+import shlex
+from typing import NamedTuple
+import numpy as np
 import pandas as pd
 
 from database import DatabaseHandler
 from config import INITIAL_CAPITAL  # or you can just define inside this file
-from backtest import backtest_strategy, buy_and_hold
+from backtest import backtest_combined_signals, buy_and_hold
 from optimizer import STRATEGY_FUNCTIONS, signal_cache
-from combo_signals import combine_signals
+
+class TestResult(NamedTuple):
+    """
+    One test_combo outcome. A NamedTuple rather than a dict: a single
+    compact allocation per call (no per-key hashing) with C-level
+    attribute access, and pandas/np.rec consume lists of these directly
+    for vectorized aggregation.
+    """
+    symbol: str
+    start_date: str
+    end_date: str
+    strategy_combo: list
+    buy_operator: str
+    sell_operator: str
+    best_params: dict
+    strategy_return: float
+    final_portfolio_val: float
+    num_trades: int
+    bh_return: float
+    bh_val: float
 
 def test_combo(
     symbol: str,
@@ -17,13 +43,19 @@ def test_combo(
     buy_operator: str,
     sell_operator: str,
     best_params,
-    initial_capital=10000
+    initial_capital=10000,
+    df=None,
+    verbose=True
 ):
     """
     Fetch data for the given symbol from start_date to end_date,
     combine signals from the given strategies + best_params,
-    run a backtest, return stats.
-    
+    run a backtest, return stats. A pre-fetched frame can be passed as
+    df (main() bulk-fetches every symbol in one query), in which case
+    the DB is not touched. verbose=False suppresses the per-symbol
+    results printout - sweeps calling this in a loop should use it and
+    consume the returned TestResult instead.
+
     strategy_combo: list of strategy names, e.g. ["macd", "bollinger_bands"]
     buy_operator, sell_operator: "AND" or "OR"
     best_params: e.g. {
@@ -35,24 +67,31 @@ def test_combo(
     }
     """
 
-    db = DatabaseHandler()
-    df = db.get_historical_data(symbol, start_date, end_date)
-    db.close()
+    if df is None:
+        db = DatabaseHandler()
+        df = db.get_historical_data(symbol, start_date, end_date)
+        db.close()
 
     if len(df) < 2:
         print(f"No data returned for {symbol} in {start_date} to {end_date}. Exiting.")
         return None
 
-    # Precompute returns for efficiency
-    returns = df["close_price"].pct_change().fillna(0)
+    # Project down to the columns the chosen strategies actually read
+    # (per-strategy REQUIRED_COLS manifests) - the backtest scan is
+    # memory-bound, so unused OHLCV columns just evict useful cache lines
+    needed = frozenset({"close_price"}).union(
+        *(STRATEGY_FUNCTIONS[s].REQUIRED_COLS for s in strategy_combo)
+    )
+    if not needed.issuperset(df.columns):
+        df = df[[c for c in df.columns if c in needed]]
 
-    # Calculate buy-and-hold for reference
-    bh_perf, bh_val = buy_and_hold(df.copy(), initial_capital)
+    # Calculate buy-and-hold for reference (close-price view only; no copy)
+    bh_perf, bh_val = buy_and_hold(df["close_price"].to_numpy(), initial_capital)
 
-    # Build the final combined signal
-    if len(strategy_combo) == 1:
-        # Single strategy
-        sname = strategy_combo[0]
+    # Stack the per-strategy signals as columns of one int8 matrix; a
+    # single strategy is just the one-column case of the same path
+    signals = np.empty((len(df), len(strategy_combo)), dtype=np.int8)
+    for i, sname in enumerate(strategy_combo):
         if isinstance(best_params, dict):
             if "Strategies" in best_params:
                 # Extract from 'Strategies' dict
@@ -64,73 +103,83 @@ def test_combo(
             strat_params = {}
 
         # Use signal_cache for efficient signal computation
-        signal = signal_cache.get(sname, df, **strat_params)
-        df["signal"] = signal
-    else:
-        # Multi-strategy
-        signal_dfs = []
-        for sname in strategy_combo:
-            if "Strategies" in best_params:
-                # Extract from 'Strategies' dict
-                strat_params = best_params["Strategies"].get(sname, {})
-            else:
-                # Handle old format for backward compatibility
-                strat_params = best_params.get(sname, {})
-            
-            # Use signal_cache for efficient signal computation
-            s_signal = signal_cache.get(sname, df, **strat_params)
-            signal_dfs.append(pd.DataFrame({"signal": s_signal}, index=df.index))
-
-        final_signal = combine_signals(signal_dfs, buy_operator=buy_operator, sell_operator=sell_operator)
-        df["signal"] = final_signal
+        signals[:, i] = signal_cache.get(sname, df, **strat_params).to_numpy(
+            dtype=np.int8, copy=False
+        )
 
     # Get min_holding_period from Meta params if available
     min_holding_period = 0
-    if "Meta" in best_params:
+    if isinstance(best_params, dict) and "Meta" in best_params:
         min_holding_period = best_params["Meta"].get("min_holding_period", 0)
 
-    # Run backtest with precomputed returns for efficiency
-    total_return, final_portfolio_val, num_trades = backtest_strategy(
-        df, 
-        initial_capital=initial_capital, 
-        min_holding_period=min_holding_period,
-        precomputed_returns=returns
+    # Combine + backtest in one fused kernel pass: no combined-signal or
+    # position arrays are materialized between the stages
+    total_return, final_portfolio_val, num_trades = backtest_combined_signals(
+        df["close_price"].to_numpy(),
+        signals,
+        buy_operator=buy_operator,
+        sell_operator=sell_operator,
+        initial_capital=initial_capital,
+        min_holding_period=min_holding_period
     )
 
-    # Print results
-    print("\n=== Test Results ===")
-    print(f"Symbol:            {symbol}")
-    print(f"Date Range:        {start_date} to {end_date}")
-    print(f"Strategy Combo:    {strategy_combo}")
-    print(f"Buy Operator:      {buy_operator}")
-    print(f"Sell Operator:     {sell_operator}")
-    print(f"Best Params:       {best_params}")
-    print(f"---")
-    print(f"Strategy Return:   {total_return:.2%}")
-    print(f"Strategy Final Val: ${final_portfolio_val:,.2f}")
-    print(f"Number of Trades:  {num_trades}")
-    print(f"---")
-    print(f"Buy & Hold Return: {bh_perf:.2%}")
-    print(f"Buy & Hold Val:    ${bh_val:,.2f}")
-
-    # Optionally return results as a dict
-    return {
-        "symbol": symbol,
-        "start_date": start_date,
-        "end_date": end_date,
-        "strategy_combo": strategy_combo,
-        "buy_operator": buy_operator,
-        "sell_operator": sell_operator,
-        "best_params": best_params,
-        "strategy_return": total_return,
-        "final_portfolio_val": final_portfolio_val,
-        "num_trades": num_trades,
-        "bh_return": bh_perf,
-        "bh_val": bh_val
-    }
+    # Print results (skipped in sweeps: stdout flushes can dominate the
+    # wall time of a cheap backtest)
+    if verbose:
+        print("\n=== Test Results ===")
+        print(f"Symbol:            {symbol}")
+        print(f"Date Range:        {start_date} to {end_date}")
+        print(f"Strategy Combo:    {strategy_combo}")
+        print(f"Buy Operator:      {buy_operator}")
+        print(f"Sell Operator:     {sell_operator}")
+        print(f"Best Params:       {best_params}")
+        print(f"---")
+        print(f"Strategy Return:   {total_return:.2%}")
+        print(f"Strategy Final Val: ${final_portfolio_val:,.2f}")
+        print(f"Number of Trades:  {num_trades}")
+        print(f"---")
+        print(f"Buy & Hold Return: {bh_perf:.2%}")
+        print(f"Buy & Hold Val:    ${bh_val:,.2f}")
+
+    return TestResult(
+        symbol=symbol,
+        start_date=start_date,
+        end_date=end_date,
+        strategy_combo=strategy_combo,
+        buy_operator=buy_operator,
+        sell_operator=sell_operator,
+        best_params=best_params,
+        strategy_return=total_return,
+        final_portfolio_val=final_portfolio_val,
+        num_trades=num_trades,
+        bh_return=bh_perf,
+        bh_val=bh_val
+    )
 
 
-def main():
+def _parse_literal(text):
+    """
+    Parse a user-supplied list/dict string. JSON is tried first (C
+    parser, much faster than building and walking an AST - relevant when
+    configs are piped in bulk), falling back to ast.literal_eval so
+    single-quote Python-dict syntax keeps working.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+def _run_one(kwargs):
+    """
+    Worker entry for the per-symbol process pool: plain function over a
+    picklable kwargs dict. test_combo opens its own DB connection, so
+    each worker process connects independently.
+    """
+    return test_combo(**kwargs)
+
+
+def run_batch():
     # Example of interactive prompts (or you can hard-code them).
     symbol_input = input("Enter comma-separated symbols (e.g. 'BTC/USD,ETH/USD'): ")
     start_date = input("Start date (YYYY-MM-DD): ")
@@ -138,8 +187,8 @@ def main():
 
     # Strategy combo can be a Python list string, e.g. "['macd','bollinger_bands']"
     strategy_combo_str = input("Enter strategy combo list (e.g. ['macd','bollinger_bands']): ")
-    # Safely parse that string into a Python list
-    strategy_combo = ast.literal_eval(strategy_combo_str)
+    # Safely parse that string into a Python list (JSON or Python syntax)
+    strategy_combo = _parse_literal(strategy_combo_str)
 
     buy_operator  = input("Buy operator (AND/OR): ")
     sell_operator = input("Sell operator (AND/OR): ")
@@ -154,14 +203,22 @@ def main():
     #   'Meta': {'penalty_factor': 0.0, 'min_holding_period': 5, 'sharpe_ratio_weight': 0.0}
     # }
     best_params_str = input("Enter best_params as a dict (e.g. { ... }): ")
-    best_params = ast.literal_eval(best_params_str)
+    best_params = _parse_literal(best_params_str)
 
     # Convert the user's symbol input into a list
     symbols = [s.strip() for s in symbol_input.split(",")]
 
-    # Run test for each symbol
-    for sym in symbols:
-        results = test_combo(
+    # One bulk query for every symbol's history instead of a connection
+    # setup + serial query per symbol
+    db = DatabaseHandler()
+    frames = db.get_historical_data_bulk(symbols, start_date, end_date)
+    db.close()
+
+    # Each symbol's signal compute + backtest is independent, so spread
+    # symbols across a process pool (compute-bound pandas/NumPy work, so
+    # processes rather than threads)
+    symbol_kwargs = [
+        dict(
             symbol=sym,
             start_date=start_date,
             end_date=end_date,
@@ -169,9 +226,94 @@ def main():
             buy_operator=buy_operator,
             sell_operator=sell_operator,
             best_params=best_params,
-            initial_capital=INITIAL_CAPITAL  # or define your own number
+            initial_capital=INITIAL_CAPITAL,  # or define your own number
+            df=frames.get(sym),
+            # Workers stay quiet (interleaved prints from a pool are
+            # useless anyway); single-symbol runs print as before
+            verbose=len(symbols) == 1
+        )
+        for sym in symbols
+    ]
+
+    if len(symbol_kwargs) == 1:
+        results = [_run_one(symbol_kwargs[0])]
+    else:
+        max_workers = min(len(symbol_kwargs), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_run_one, symbol_kwargs))
+        # One consolidated CSV instead of 12 interleaved lines per worker
+        rows = [r for r in results if r is not None]
+        if rows:
+            pd.DataFrame(rows).to_csv("test_results.csv", index=False)
+            print(f"Wrote {len(rows)} result(s) to test_results.csv")
+
+
+class TesterShell(cmd.Cmd):
+    """
+    Interactive loop for repeated manual testing. One process keeps the
+    DB connection, fetched frames, warmed JIT kernels, and signal_cache
+    alive across commands, instead of paying imports + connect + fetch
+    on every script invocation.
+    """
+
+    intro = "Strategy tester. Type 'help' for commands, 'quit' to exit."
+    prompt = "(tester) "
+
+    def __init__(self):
+        super().__init__()
+        self.db = DatabaseHandler()
+        self._frames = {}
+
+    def _frame(self, symbol, start_date, end_date):
+        """Fetch-once frame cache keyed by (symbol, start, end)"""
+        key = (symbol, start_date, end_date)
+        df = self._frames.get(key)
+        if df is None:
+            df = self.db.get_historical_data(symbol, start_date, end_date)
+            self._frames[key] = df
+        return df
+
+    def do_run(self, line):
+        """run SYMBOL START END COMBO BUY_OP SELL_OP PARAMS
+        COMBO: strategy list, e.g. '["macd","rsi"]'
+        PARAMS: best_params dict (JSON or Python syntax), or @file.json
+        Quote arguments containing spaces."""
+        parts = shlex.split(line)
+        if len(parts) != 7:
+            print("usage: run SYMBOL START END COMBO BUY_OP SELL_OP PARAMS")
+            return
+        symbol, start_date, end_date, combo_str, buy_op, sell_op, params_str = parts
+        if params_str.startswith("@"):
+            with open(params_str[1:]) as fh:
+                params_str = fh.read()
+        try:
+            strategy_combo = _parse_literal(combo_str)
+            best_params = _parse_literal(params_str)
+        except (ValueError, SyntaxError) as exc:
+            print(f"Could not parse combo/params: {exc}")
+            return
+        test_combo(
+            symbol, start_date, end_date,
+            strategy_combo, buy_op, sell_op, best_params,
+            initial_capital=INITIAL_CAPITAL,
+            df=self._frame(symbol, start_date, end_date)
         )
-        # You could store or further process `results` here
+
+    def do_batch(self, line):
+        """Prompt-driven multi-symbol run (the original main() flow)"""
+        run_batch()
+
+    def do_quit(self, line):
+        """Close the DB connection and exit"""
+        self.db.close()
+        return True
+
+    # Ctrl-D behaves like quit
+    do_EOF = do_quit
+
+
+def main():
+    TesterShell().cmdloop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file